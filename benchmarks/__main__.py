@@ -0,0 +1,64 @@
+"""
+  Runs all benchmarks and prints a single JSON document, e.g. to compare results of a pull request with the main branch.
+
+  Usage: python -m benchmarks [--output results.json] [--jobs N] [--latency SECONDS] [--error-rate RATE]
+"""
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import argparse
+import json
+import platform
+import subprocess
+
+from benchmarks import bench_connectors, bench_import, bench_models
+
+
+def _revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", help="File to write results to, instead of stdout.")
+    bench_connectors.add_arguments(parser)
+    options = parser.parse_args()
+
+    results = json.dumps(
+        {
+            "revision": _revision(),
+            "python": platform.python_version(),
+            "parameters": vars(options) | {"output": None},
+            "connectors": bench_connectors.run(
+                options.jobs, bench_connectors.faults_from_arguments(options)
+            ),
+            "models": bench_models.run(number=500),
+            "import": bench_import.run(repeat=3),
+        },
+        indent=2,
+    )
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as output:
+            output.write(results)
+    else:
+        print(results)
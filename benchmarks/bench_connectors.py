@@ -0,0 +1,246 @@
+"""
+  Benchmarks Beast and Boxer connectors against the in-process fake server.
+
+  Usage: python -m benchmarks.bench_connectors [--jobs N] [--latency SECONDS] [--error-rate RATE]
+"""
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import argparse
+import base64
+import contextlib
+import io
+import json
+import statistics
+import time
+import uuid
+
+from Crypto.PublicKey import RSA
+
+from esd_services_api_client.beast.v3 import (
+    BeastConnector,
+    BeastJobParams,
+    BeastJobWatcher,
+    FixedPollingStrategy,
+)
+from esd_services_api_client.boxer import (
+    BoxerAuth,
+    BoxerConnector,
+    BoxerTokenAuth,
+    ExternalTokenAuth,
+)
+from esd_services_api_client.testing import FakeServiceServer, FaultInjection
+
+
+def _connector(server: FakeServiceServer) -> BeastConnector:
+    return BeastConnector.create_anonymous(
+        base_url=server.url, polling_strategy=FixedPollingStrategy(0)
+    )
+
+
+def _job_params(jobs: int) -> list[BeastJobParams]:
+    run_id = uuid.uuid4().hex
+    return [
+        BeastJobParams(client_tag=f"{run_id}-{n}", extra_arguments={"n": str(n)})
+        for n in range(jobs)
+    ]
+
+
+def _http_requests(server: FakeServiceServer) -> int:
+    return sum(server.request_counts.values())
+
+
+def submit_throughput(
+    server: FakeServiceServer, jobs: int, concurrency: int = 16
+) -> dict:
+    """
+      Submits jobs one by one with start_job, and all at once with submit_many.
+
+    :return: Jobs per second for each mode, and the share of successful bulk submissions
+    """
+    connector = _connector(server)
+    sequential_jobs = max(jobs // 10, 1)
+
+    started_at = time.perf_counter()
+    for params in _job_params(sequential_jobs):
+        connector.start_job(params, "benchmark")
+    sequential = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    results = connector.submit_many(
+        _job_params(jobs), "benchmark", concurrency=concurrency
+    )
+    bulk = time.perf_counter() - started_at
+
+    return {
+        "sequential_jobs_per_second": round(sequential_jobs / sequential, 1),
+        "bulk_jobs_per_second": round(jobs / bulk, 1),
+        "bulk_concurrency": concurrency,
+        "bulk_success_ratio": round(
+            sum(result.succeeded for result in results.values()) / jobs, 3
+        ),
+    }
+
+
+def polling_overhead(server: FakeServiceServer, jobs: int) -> dict:
+    """
+      Tracks submitted jobs to completion, with run_job and with a shared BeastJobWatcher.
+
+    :return: HTTP requests and client time per tracked job
+    """
+    connector = _connector(server)
+    run_jobs = max(jobs // 10, 1)
+
+    requests_before = _http_requests(server)
+    started_at = time.perf_counter()
+    for params in _job_params(run_jobs):
+        connector.run_job(params, "benchmark")
+    run_job_seconds = time.perf_counter() - started_at
+    run_job_requests = _http_requests(server) - requests_before
+
+    request_ids = [
+        result.request_id
+        for result in connector.submit_many(_job_params(jobs), "benchmark").values()
+        if result.succeeded
+    ]
+    watcher = BeastJobWatcher(connector, check_interval=None)
+    futures = [watcher.watch(request_id) for request_id in request_ids]
+    requests_before = _http_requests(server)
+    poll_durations = []
+    while not all(future.done() for future in futures):
+        started_at = time.perf_counter()
+        watcher.poll_once()
+        poll_durations.append(time.perf_counter() - started_at)
+    watcher.stop()
+
+    return {
+        "run_job_requests_per_job": round(run_job_requests / run_jobs, 2),
+        "run_job_ms_per_job": round(run_job_seconds / run_jobs * 1000, 2),
+        "watcher_jobs": len(request_ids),
+        "watcher_requests_per_job": round(
+            (_http_requests(server) - requests_before) / max(len(request_ids), 1), 2
+        ),
+        "watcher_poll_ms_per_job": round(
+            statistics.mean(poll_durations) / max(len(request_ids), 1) * 1000, 3
+        ),
+    }
+
+
+def token_latency(server: FakeServiceServer, samples: int = 50) -> dict:
+    """
+      Measures Boxer token acquisition, and reuse of a cached token.
+
+    :return: Median latency in milliseconds of a new token and of a cached token
+    """
+    boxer = BoxerConnector(
+        base_url=server.url, auth=ExternalTokenAuth("external", "benchmark")
+    )
+    fetch = []
+    for _ in range(samples):
+        started_at = time.perf_counter()
+        boxer.get_token()
+        fetch.append(time.perf_counter() - started_at)
+
+    auth = BoxerTokenAuth(boxer)
+    auth._get_token()  # pylint: disable=protected-access
+    cached = []
+    for _ in range(samples):
+        started_at = time.perf_counter()
+        auth._get_token()  # pylint: disable=protected-access
+        cached.append(time.perf_counter() - started_at)
+
+    return {
+        "fetch_ms_p50": round(statistics.median(fetch) * 1000, 3),
+        "cached_ms_p50": round(statistics.median(cached) * 1000, 4),
+    }
+
+
+def signing_cost(samples: int = 200) -> dict:
+    """
+      Measures BoxerAuth request signing, for new payloads and for repeated ones.
+
+    :return: Mean time in microseconds per signature
+    """
+    private_key = base64.b64encode(RSA.generate(2048).export_key("DER")).decode()
+    auth = BoxerAuth(private_key_base64=private_key, consumer_id="benchmark")
+    auth._get_signer()  # pylint: disable=protected-access
+
+    started_at = time.perf_counter()
+    for n in range(samples):
+        auth._sign_string(f"boxer.test/token/{n}")  # pylint: disable=protected-access
+    new_payloads = (time.perf_counter() - started_at) / samples
+
+    started_at = time.perf_counter()
+    for _ in range(samples):
+        auth._sign_string("boxer.test/token/0")  # pylint: disable=protected-access
+    repeated_payloads = (time.perf_counter() - started_at) / samples
+
+    return {
+        "new_payload_us": round(new_payloads * 1e6, 1),
+        "repeated_payload_us": round(repeated_payloads * 1e6, 2),
+    }
+
+
+def run(jobs: int, faults: FaultInjection) -> dict:
+    """
+      Runs all connector benchmarks against a fresh fake server.
+
+    :param jobs: Number of jobs submitted and tracked in the Beast benchmarks.
+    :param faults: Latency and error injection for the fake server.
+    :return: Results of each benchmark
+    """
+    # connectors print progress, which would mix with the machine-readable output
+    with contextlib.redirect_stdout(io.StringIO()), FakeServiceServer(
+        faults=faults, seed=42
+    ) as server:
+        return {
+            "submit_throughput": submit_throughput(server, jobs),
+            "polling_overhead": polling_overhead(server, jobs),
+            "token_latency": token_latency(server),
+            "signing_cost": signing_cost(),
+        }
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+      Adds fake server and workload options to a command line parser.
+
+    :param parser: Parser to extend.
+    """
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--error-rate", type=float, default=0)
+
+
+def faults_from_arguments(arguments: argparse.Namespace) -> FaultInjection:
+    """
+      Creates fault injection settings from parsed command line options.
+
+    :param arguments: Parsed options.
+    :return: FaultInjection with throttling errors that ask to retry immediately
+    """
+    return FaultInjection(
+        latency=arguments.latency,
+        error_rate=arguments.error_rate,
+        error_status=429,
+        retry_after=0,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_arguments(parser)
+    options = parser.parse_args()
+    print(json.dumps(run(options.jobs, faults_from_arguments(options)), indent=2))
@@ -0,0 +1,66 @@
+"""
+  Measures import time of package entrypoints in fresh interpreters.
+
+  Usage: python -m benchmarks.bench_import [--repeat N]
+"""
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = [
+    "import esd_services_api_client.beast",
+    "import esd_services_api_client.boxer",
+    "from esd_services_api_client.beast import JobRequest, BeastJobParams",
+    "from esd_services_api_client.boxer import BoxerTokenAuth",
+    "from esd_services_api_client.boxer import BoxerClaimConnector",
+    "from esd_services_api_client.beast import BeastConnector",
+]
+
+
+def _import_seconds(statement: str) -> float:
+    probe = f"import time; started_at = time.perf_counter(); {statement}; print(time.perf_counter() - started_at)"
+    result = subprocess.run(
+        [sys.executable, "-c", probe], capture_output=True, text=True, check=True
+    )
+    return float(result.stdout)
+
+
+def run(repeat: int) -> dict:
+    """
+      Imports each statement in new interpreters.
+
+    :param repeat: Number of interpreters started per statement.
+    :return: Median and max import time in milliseconds per statement
+    """
+    results = {}
+    for statement in STATEMENTS:
+        timings = [_import_seconds(statement) * 1000 for _ in range(repeat)]
+        results[statement] = {
+            "median_ms": round(statistics.median(timings), 1),
+            "max_ms": round(max(timings), 1),
+        }
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    print(json.dumps(run(parser.parse_args().repeat), indent=2))
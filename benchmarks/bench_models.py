@@ -0,0 +1,113 @@
+"""
+  Compares dataclasses_json and hand-specialized codecs for Beast models.
+
+  Usage: python -m benchmarks.bench_models [--number N]
+"""
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import argparse
+import json
+import timeit
+
+from esd_services_api_client.beast.v3 import (
+    JobRequest,
+    JobSocket,
+    SparkSubmissionConfiguration,
+)
+from esd_services_api_client.beast.v3._codecs import (
+    job_request_to_dict,
+    spark_submission_configuration_from_json,
+)
+
+REQUEST = JobRequest(
+    inputs=[
+        JobSocket(alias=f"in{i}", data_path=f"abfss://in/{i}", data_format="delta")
+        for i in range(5)
+    ],
+    outputs=[
+        JobSocket(alias=f"out{i}", data_path=f"abfss://out/{i}", data_format="delta")
+        for i in range(2)
+    ],
+    extra_args={f"arg{i}": str(i) for i in range(10)},
+    client_tag="benchmark",
+    expected_parallelism=16,
+)
+
+CONFIGURATION = json.dumps(
+    {
+        "rootPath": "/ecco/dist",
+        "projectName": "project",
+        "runnable": "main.py",
+        "submissionDetails": {
+            "version": "3.5.0",
+            "executionGroup": "default",
+            "expectedParallelism": 4,
+            "flexibleDriver": False,
+            "additionalDriverNodeTolerations": {},
+            "maxRuntimeHours": 1,
+            "debugMode": None,
+            "submissionMode": "k8s",
+            "extendedCodeMount": False,
+            "submissionJobTemplate": "default",
+            "executorSpecTemplate": "default",
+            "driverJobRetries": 1,
+            "defaultArguments": {f"arg{i}": str(i) for i in range(10)},
+            "inputs": [
+                {"alias": f"in{i}", "dataPath": f"abfss://in/{i}", "dataFormat": "csv"}
+                for i in range(5)
+            ],
+            "outputs": [],
+            "overwrite": True,
+        },
+    }
+).encode("utf-8")
+
+CASES = {
+    "job_request_encode": (
+        lambda: json.dumps(REQUEST.to_dict()),
+        lambda: json.dumps(job_request_to_dict(REQUEST)),
+    ),
+    "configuration_decode": (
+        lambda: SparkSubmissionConfiguration.from_dict(json.loads(CONFIGURATION)),
+        lambda: spark_submission_configuration_from_json(CONFIGURATION),
+    ),
+}
+
+
+def run(number: int) -> dict:
+    """
+      Times each case with the dataclasses_json and the fast path.
+
+    :param number: Number of calls per measurement.
+    :return: Microseconds per call for each case and path, and the speedup
+    """
+    results = {}
+    for name, (current, fast) in CASES.items():
+        current_time = min(timeit.repeat(current, number=number, repeat=5)) / number
+        fast_time = min(timeit.repeat(fast, number=number, repeat=5)) / number
+        results[name] = {
+            "dataclasses_json_us": round(current_time * 1e6, 2),
+            "fast_path_us": round(fast_time * 1e6, 2),
+            "speedup": round(current_time / fast_time, 1),
+        }
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=2000)
+    print(json.dumps(run(parser.parse_args().number), indent=2))
@@ -1,5 +1,5 @@
 """
- Import index.
+ Import index. Names are loaded from the current API version on first access.
 """
 
 #  Copyright (c) 2023-2024. ECCO Sneaks & Data
@@ -17,5 +17,19 @@
 #  limitations under the License.
 #
 
+from typing import TYPE_CHECKING
+
+from esd_services_api_client._lazy import lazy_exports
+
 # This makes v3 (GA version) the default import
-from esd_services_api_client.beast.v3 import *
+from esd_services_api_client.beast.v3 import (
+    _EXPORTS as _V3_EXPORTS,
+    _OPTIONAL_EXPORTS as _V3_OPTIONAL_EXPORTS,
+)
+
+__all__ = [name for name in _V3_EXPORTS if name not in _V3_OPTIONAL_EXPORTS]
+
+__getattr__, __dir__ = lazy_exports(__name__, dict.fromkeys(_V3_EXPORTS, "v3"))
+
+if TYPE_CHECKING:
+    from esd_services_api_client.beast.v3 import *
@@ -1,5 +1,5 @@
 """
- Import index.
+ Import index. Names are loaded from submodules on first access, so importing the package stays cheap.
 """
 
 #  Copyright (c) 2023-2024. ECCO Sneaks & Data
@@ -17,5 +17,60 @@
 #  limitations under the License.
 #
 
-from esd_services_api_client.beast.v3._connector import BeastConnector
-from esd_services_api_client.beast.v3._models import *
+from typing import TYPE_CHECKING
+
+from esd_services_api_client._lazy import lazy_exports
+
+_EXPORTS = {
+    "TerminalRequestCache": "_cache",
+    "ConfigurationCache": "_cache",
+    "CachedConfiguration": "_cache",
+    "SubmissionJournal": "_journal",
+    "JournalEntry": "_journal",
+    "BeastConnector": "_connector",
+    "BeastJobWatcher": "_watcher",
+    "LifecycleEventReceiver": "_events",
+    "PollingStrategy": "_polling",
+    "FixedPollingStrategy": "_polling",
+    "AdaptivePollingStrategy": "_polling",
+    "JobSocket": "_models",
+    "JobRequest": "_models",
+    "ArgumentValue": "_models",
+    "BeastJobParams": "_models",
+    "RequestDebugMode": "_models",
+    "SparkSubmissionDetails": "_models",
+    "SparkSubmissionConfiguration": "_models",
+    "JobSubmissionResult": "_models",
+    # requires httpx, install with the `async` extra to use AsyncBeastConnector
+    "AsyncBeastConnector": "_async_connector",
+}
+
+# names that need optional dependencies are importable by name, but not through star imports
+_OPTIONAL_EXPORTS = {
+    "AsyncBeastConnector",
+}
+
+__all__ = [name for name in _EXPORTS if name not in _OPTIONAL_EXPORTS]
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from esd_services_api_client.beast.v3._cache import (
+        TerminalRequestCache,
+        ConfigurationCache,
+        CachedConfiguration,
+    )
+    from esd_services_api_client.beast.v3._journal import (
+        SubmissionJournal,
+        JournalEntry,
+    )
+    from esd_services_api_client.beast.v3._connector import BeastConnector
+    from esd_services_api_client.beast.v3._watcher import BeastJobWatcher
+    from esd_services_api_client.beast.v3._events import LifecycleEventReceiver
+    from esd_services_api_client.beast.v3._polling import (
+        PollingStrategy,
+        FixedPollingStrategy,
+        AdaptivePollingStrategy,
+    )
+    from esd_services_api_client.beast.v3._models import *
+    from esd_services_api_client.beast.v3._async_connector import AsyncBeastConnector
@@ -0,0 +1,429 @@
+"""
+  Async connector for Beast Workload Manager (Spark AKS)
+"""
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import asyncio
+import json
+from http.client import HTTPException
+from json import JSONDecodeError
+from typing import Optional, Any, AsyncGenerator
+
+import backoff
+import httpx
+
+from esd_services_api_client.beast.v3._cache import TerminalRequestCache
+from esd_services_api_client.beast.v3._codecs import (
+    job_request_to_dict,
+    spark_submission_configuration_from_json,
+)
+from esd_services_api_client.beast.v3._models import (
+    JobRequest,
+    BeastJobParams,
+    SparkSubmissionConfiguration,
+)
+from esd_services_api_client.boxer import BoxerTokenAuth
+
+
+class _RetryableStatusError(httpx.HTTPStatusError):
+    """
+    Throttling or server error response. Other error responses are not retried, as in BeastConnector.
+    """
+
+
+def _raise_for_status(response: "httpx.Response") -> None:
+    try:
+        response.raise_for_status()
+    except httpx.HTTPStatusError as status_error:
+        # BeastConnector's session retries the same status codes before raising
+        if response.status_code == 429 or response.is_server_error:
+            raise _RetryableStatusError(
+                str(status_error),
+                request=status_error.request,
+                response=status_error.response,
+            ) from status_error
+        raise
+
+
+class _BoxerHttpxAuth(httpx.Auth):
+    """
+    Adapts BoxerTokenAuth to httpx, mirroring the refresh hook used by requests sessions.
+    """
+
+    def __init__(self, auth: BoxerTokenAuth):
+        self._auth = auth
+
+    async def async_auth_flow(
+        self, request: "httpx.Request"
+    ) -> AsyncGenerator["httpx.Request", "httpx.Response"]:
+        # token provider is blocking, so keep it off the event loop
+        token = await asyncio.to_thread(self._auth._get_token)
+        request.headers["Authorization"] = f"Bearer {token}"
+        response = yield request
+        if response.status_code == 401:
+            # concurrent rejections of the same token then share a single refresh
+            rejected_token = request.headers["Authorization"].removeprefix("Bearer ")
+            token = await asyncio.to_thread(
+                self._auth._get_token, refresh=True, rejected_token=rejected_token
+            )
+            request.headers["Authorization"] = f"Bearer {token}"
+            yield request
+
+
+class AsyncBeastConnector:
+    """
+    Beast API connector for asyncio applications. All connector instances created with the same client share its connection pool.
+    """
+
+    def __init__(
+        self,
+        *,
+        base_url,
+        code_root="/ecco/dist",
+        lifecycle_check_interval: int = 60,
+        auth: Optional[BoxerTokenAuth] = None,
+        failure_type: Optional[Exception] = None,
+        client: Optional["httpx.AsyncClient"] = None,
+        max_connections: int = 100,
+        lookup_concurrency: int = 8,
+        request_cache: Optional[TerminalRequestCache] = None,
+    ):
+        """
+          Creates an async Beast connector, capable of submitting/status tracking etc.
+
+        :param base_url: Base URL for Beast Workload Manager.
+        :param code_root: Root folder for code deployments.
+        :param auth: Boxer-based authentication
+        :param lifecycle_check_interval: Time to wait between lifecycle checks for submissions/cancellations etc.
+        :param client: Optional pre-configured httpx client to share a connection pool between connectors.
+        :param max_connections: Size of the connection pool, if the client is created by this connector.
+        :param lookup_concurrency: Maximum number of concurrent request lookups when searching for existing submissions.
+        :param request_cache: Cache for requests in terminal stages. Defaults to an in-memory cache.
+        """
+        self.base_url = base_url
+        self.code_root = code_root
+        self.lifecycle_check_interval = lifecycle_check_interval
+        self.failed_stages = [
+            "FAILED",
+            "SCHEDULING_FAILED",
+            "RETRIES_EXCEEDED",
+            "SUBMISSION_FAILED",
+            "STALE",
+        ]
+        self.success_stages = ["COMPLETED"]
+        self._owns_client = client is None
+        self.http = client or httpx.AsyncClient(
+            http2=True,
+            timeout=300,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self._auth = _BoxerHttpxAuth(auth) if auth else None
+        self._failure_type = failure_type or Exception
+        self._lookup_concurrency = lookup_concurrency
+        self._request_cache = request_cache or TerminalRequestCache()
+        self._version = "v3"
+
+    @property
+    def version(self):
+        """
+        Returns the client API version for this connector
+        """
+        return self._version
+
+    @property
+    def request_cache(self) -> TerminalRequestCache:
+        """
+        Returns the cache for requests in terminal stages
+        """
+        return self._request_cache
+
+    async def __aenter__(self) -> "AsyncBeastConnector":
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Closes the underlying http client, unless it was provided by the caller.
+        """
+        if self._owns_client:
+            await self.http.aclose()
+
+    async def _get(self, url: str) -> "httpx.Response":
+        return await self.http.get(url, auth=self._auth or httpx.USE_CLIENT_DEFAULT)
+
+    def _is_terminal(self, lifecycle_stage: Optional[str]) -> bool:
+        return (
+            lifecycle_stage in self.success_stages
+            or lifecycle_stage in self.failed_stages
+        )
+
+    async def _fetch_request(
+        self, request_id: str, lookup_limit: Optional[asyncio.Semaphore] = None
+    ) -> dict:
+        if lookup_limit:
+            async with lookup_limit:
+                response = await self._get(f"{self.base_url}/job/requests/{request_id}")
+        else:
+            response = await self._get(f"{self.base_url}/job/requests/{request_id}")
+        _raise_for_status(response)
+        request_record = response.json()
+        if self._is_terminal(request_record["lifeCycleStage"]):
+            self._request_cache.put(request_id, request_record)
+
+        return request_record
+
+    async def _read_request(self, request_id: str) -> dict:
+        if (request_record := self._request_cache.get(request_id)) is not None:
+            return request_record
+
+        return await self._fetch_request(request_id)
+
+    async def _read_lifecycle_stage(self, request_id: str) -> str:
+        return (await self._read_request(request_id))["lifeCycleStage"]
+
+    async def _submit(self, request: JobRequest, spark_job_name: str) -> (str, str):
+        request_json = job_request_to_dict(request)
+
+        print(f"Submitting request: {json.dumps(request_json)}")
+
+        submission_result = await self.http.post(
+            f"{self.base_url}/job/submit/{spark_job_name}",
+            json=request_json,
+            auth=self._auth or httpx.USE_CLIENT_DEFAULT,
+        )
+
+        if submission_result.status_code == 202 and (
+            submission_json := submission_result.json()
+        ):
+            print(
+                f"Beast has accepted the request, stage: {submission_json['lifeCycleStage']}, id: {submission_json['id']}"
+            )
+        else:
+            raise HTTPException(
+                f"Error {submission_result.status_code} when submitting a request: {submission_result.text}"
+            )
+
+        return submission_json["id"], submission_json["lifeCycleStage"]
+
+    @backoff.on_exception(
+        wait_gen=backoff.expo,
+        exception=(
+            httpx.TransportError,
+            _RetryableStatusError,
+            KeyError,
+            JSONDecodeError,
+            ConnectionError,
+            ConnectionRefusedError,
+            ConnectionAbortedError,
+            ConnectionResetError,
+        ),
+        max_time=300,
+        raise_on_giveup=True,
+    )
+    async def _existing_submission(
+        self, submitted_tag: str
+    ) -> (Optional[str], Optional[str]):
+        print(f"Looking for existing submissions of {submitted_tag}")
+
+        response = await self._get(f"{self.base_url}/job/requests/tags/{submitted_tag}")
+        _raise_for_status(response)
+        existing_submissions = response.json()
+
+        if len(existing_submissions) == 0:
+            print(f"No previous submissions found for {submitted_tag}")
+            return None, None
+
+        # terminal stages never change, so only requests not known to be terminal are looked up
+        pending_submissions = [
+            submission_request_id
+            for submission_request_id in existing_submissions
+            if self._request_cache.get(submission_request_id) is None
+        ]
+        lookup_limit = asyncio.Semaphore(self._lookup_concurrency)
+        submission_records = await asyncio.gather(
+            *[
+                self._fetch_request(submission_request_id, lookup_limit)
+                for submission_request_id in pending_submissions
+            ]
+        )
+        running_submissions = []
+        for submission_request_id, submission_record in zip(
+            pending_submissions, submission_records
+        ):
+            submission_lifecycle = submission_record["lifeCycleStage"]
+            if not self._is_terminal(submission_lifecycle):
+                print(
+                    f"Found a running submission of {submitted_tag}: {submission_request_id}."
+                )
+                running_submissions.append(
+                    (submission_request_id, submission_lifecycle)
+                )
+
+        if len(running_submissions) == 0:
+            print("None of found submissions are active")
+            return None, None
+
+        if len(running_submissions) == 1:
+            return running_submissions[0][0], running_submissions[0][1]
+
+        raise self._failure_type(
+            f"Fatal: more than one submission of {submitted_tag} is running: {running_submissions}. Please review their status restart/terminate the task accordingly"
+        )
+
+    @staticmethod
+    def _prepare_request(job_params: BeastJobParams) -> JobRequest:
+        return JobRequest(
+            inputs=job_params.project_inputs,
+            outputs=job_params.project_outputs,
+            extra_args={
+                key: str(value) for (key, value) in job_params.extra_arguments.items()
+            },
+            client_tag=job_params.client_tag,
+            expected_parallelism=job_params.expected_parallelism,
+        )
+
+    async def run_job(self, job_params: BeastJobParams, job_name: str):
+        """
+          Runs a job through Beast
+
+        :param job_params: Parameters for Beast Job body.
+        :param job_name: Name of the SparkJob to invoke.
+        :return: A JobRequest for Beast.
+        """
+
+        (request_id, request_lifecycle) = await self._existing_submission(
+            submitted_tag=job_params.client_tag
+        )
+
+        if request_id:
+            print(f"Resuming watch for {request_id}")
+
+        if not request_id:
+            (request_id, request_lifecycle) = await self._submit(
+                self._prepare_request(job_params), job_name
+            )
+
+        while (
+            request_lifecycle not in self.success_stages
+            and request_lifecycle not in self.failed_stages
+        ):
+            await asyncio.sleep(self.lifecycle_check_interval)
+            request_lifecycle = await self.get_request_lifecycle_stage(request_id)
+            print(f"Request: {request_id}, current state: {request_lifecycle}")
+
+        if request_lifecycle in self.failed_stages:
+            raise self._failure_type(
+                f"Execution failed, please find request's log at: {self.base_url}/job/logs/{request_id}"
+            )
+
+    @staticmethod
+    def _report_backoff_failure(
+        target: Any, args: Any, kwargs: Any, tries: int, elapsed: int, wait: int, **_
+    ) -> None:
+        print(
+            f"Retry with back off {wait:0.1f} seconds after {elapsed} seconds ({tries} tries), calling function {target} with args {args} and kwargs {kwargs}"
+        )
+
+    @backoff.on_exception(
+        wait_gen=backoff.expo,
+        exception=(
+            httpx.TransportError,
+            _RetryableStatusError,
+            KeyError,
+            JSONDecodeError,
+            ConnectionError,
+            ConnectionRefusedError,
+            ConnectionAbortedError,
+            ConnectionResetError,
+        ),
+        max_time=300,
+        raise_on_giveup=False,
+        on_giveup=_report_backoff_failure,
+    )
+    async def get_request_lifecycle_stage(self, request_id: str) -> Optional[str]:
+        """
+          Returns a lifecycle stage for the given request. Returns None in case error retry fails to resolve within given timeout.
+        :param request_id: A request identifier to read lifecycle stage for.
+        """
+        return await self._read_lifecycle_stage(request_id)
+
+    async def start_job(
+        self, job_params: BeastJobParams, job_name: str
+    ) -> Optional[str]:
+        """
+          Starts a job through Beast.
+
+        :param job_params: Parameters for Beast Job body.
+        :param job_name: Name of the SparkJob to invoke.
+        :return: A JobRequest for Beast.
+        """
+
+        (request_id, _) = await self._existing_submission(
+            submitted_tag=job_params.client_tag
+        )
+
+        if not request_id:
+            request_id, _ = await self._submit(
+                self._prepare_request(job_params), job_name
+            )
+
+        return request_id
+
+    @backoff.on_exception(
+        wait_gen=backoff.expo,
+        exception=(httpx.TransportError, _RetryableStatusError),
+        max_time=300,
+        raise_on_giveup=True,
+    )
+    async def get_configuration(
+        self, configuration_name: str
+    ) -> Optional[SparkSubmissionConfiguration]:
+        """
+          Returns a deployed SparkJob configuration.
+        :param configuration_name: Name of the configuration to find
+        :return: A SparkSubmissionConfiguration object, if found, or None
+        """
+        response = await self._get(f"{self.base_url}/job/deployed/{configuration_name}")
+        if response.status_code == 404:
+            return None
+        _raise_for_status(response)
+
+        return spark_submission_configuration_from_json(response.content)
+
+    @backoff.on_exception(
+        wait_gen=backoff.expo,
+        exception=(httpx.TransportError, _RetryableStatusError),
+        max_time=300,
+        raise_on_giveup=True,
+    )
+    async def get_logs(self, request_id: str) -> Optional[str]:
+        """
+          Returns logs for a running or a completed submission.
+
+        :param request_id: Submission request identifier.
+        :return: A job log, if found, or None
+        """
+        response = await self._get(f"{self.base_url}/job/logs/{request_id}")
+        if response.status_code == 404:
+            return None
+        _raise_for_status(response)
+
+        return "\n".join(response.json())
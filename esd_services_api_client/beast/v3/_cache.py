@@ -0,0 +1,221 @@
+"""
+  Caches for Beast API lookups.
+"""
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Callable, Dict
+
+from esd_services_api_client.beast.v3._models import SparkSubmissionConfiguration
+
+
+class TerminalRequestCache:
+    """
+    Bounded LRU cache of Beast request records. Only requests in a terminal stage should be stored,
+    since their records never change. Optionally backed by a local SQLite file, so records survive process restarts.
+    """
+
+    def __init__(self, *, max_size: int = 1024, path: Optional[str] = None):
+        """
+          Creates a request cache.
+
+        :param max_size: Maximum number of records kept in memory.
+        :param path: Optional path to a SQLite file used to persist records.
+        """
+        self._max_size = max_size
+        self._records: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS terminal_requests (request_id TEXT PRIMARY KEY, record TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    @property
+    def hits(self) -> int:
+        """
+        Number of lookups served from the cache.
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """
+        Number of lookups not found in the cache.
+        """
+        return self._misses
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _remember(self, request_id: str, record: dict) -> None:
+        self._records[request_id] = record
+        self._records.move_to_end(request_id)
+        while len(self._records) > self._max_size:
+            self._records.popitem(last=False)
+
+    def get(self, request_id: str) -> Optional[dict]:
+        """
+          Reads a request record from the cache.
+
+        :param request_id: Request identifier.
+        :return: A request record, if cached, or None
+        """
+        with self._lock:
+            record = self._records.get(request_id)
+            if record is not None:
+                self._records.move_to_end(request_id)
+            elif self._db is not None:
+                row = self._db.execute(
+                    "SELECT record FROM terminal_requests WHERE request_id = ?",
+                    (request_id,),
+                ).fetchone()
+                if row:
+                    record = json.loads(row[0])
+                    self._remember(request_id, record)
+
+            if record is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+
+            return record
+
+    def put(self, request_id: str, record: dict) -> None:
+        """
+          Stores a request record in the cache.
+
+        :param request_id: Request identifier.
+        :param record: Request record as returned by Beast.
+        """
+        with self._lock:
+            self._remember(request_id, record)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO terminal_requests (request_id, record) VALUES (?, ?)",
+                    (request_id, json.dumps(record)),
+                )
+                self._db.commit()
+
+    def close(self) -> None:
+        """
+        Closes the SQLite file, if one is used.
+        """
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+@dataclass
+class CachedConfiguration:
+    """
+    SparkJob configuration lookup result stored in ConfigurationCache.
+    """
+
+    configuration: Optional[SparkSubmissionConfiguration]
+    etag: Optional[str]
+    expires_at: float
+
+
+class ConfigurationCache:
+    """
+    TTL cache of deployed SparkJob configurations. Missing configurations are cached as well, with a separate TTL.
+    Expired entries are kept to allow conditional requests with their ETag.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = 300,
+        negative_ttl: float = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+          Creates a configuration cache.
+
+        :param ttl: Time in seconds a found configuration is served without contacting Beast.
+        :param negative_ttl: Time in seconds a missing configuration is served without contacting Beast.
+        :param clock: Monotonic clock returning time in seconds.
+        """
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._clock = clock
+        self._entries: Dict[str, CachedConfiguration] = {}
+        self._lock = threading.Lock()
+
+    def get(self, configuration_name: str) -> Optional[CachedConfiguration]:
+        """
+          Reads a cache entry, including expired ones.
+
+        :param configuration_name: Name of the configuration.
+        :return: A cache entry, if present, or None
+        """
+        with self._lock:
+            return self._entries.get(configuration_name)
+
+    def is_fresh(self, entry: CachedConfiguration) -> bool:
+        """
+          Checks whether an entry can be served without revalidation.
+
+        :param entry: A cache entry.
+        """
+        return entry.expires_at > self._clock()
+
+    def put(
+        self,
+        configuration_name: str,
+        configuration: Optional[SparkSubmissionConfiguration],
+        etag: Optional[str] = None,
+    ) -> CachedConfiguration:
+        """
+          Stores a configuration lookup result.
+
+        :param configuration_name: Name of the configuration.
+        :param configuration: Parsed configuration, or None if it does not exist.
+        :param etag: ETag returned by Beast for this configuration.
+        :return: The stored cache entry.
+        """
+        entry = CachedConfiguration(
+            configuration=configuration,
+            etag=etag,
+            expires_at=self._clock()
+            + (self._ttl if configuration is not None else self._negative_ttl),
+        )
+        with self._lock:
+            self._entries[configuration_name] = entry
+
+        return entry
+
+    def invalidate(self, configuration_name: Optional[str] = None) -> None:
+        """
+          Removes a single configuration, or all configurations, from the cache.
+
+        :param configuration_name: Name of the configuration to remove. If not provided, the cache is cleared.
+        """
+        with self._lock:
+            if configuration_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(configuration_name, None)
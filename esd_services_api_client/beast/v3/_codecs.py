@@ -0,0 +1,142 @@
+"""
+  Hand-specialized codecs for Beast models, bypassing dataclasses_json reflection on hot paths.
+"""
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+from typing import Union
+
+from esd_services_api_client.beast.v3._models import (
+    JobSocket,
+    JobRequest,
+    RequestDebugMode,
+    SparkSubmissionDetails,
+    SparkSubmissionConfiguration,
+)
+
+try:
+    from orjson import loads  # pylint: disable=no-name-in-module
+except ImportError:
+    from json import loads
+
+
+def job_socket_to_dict(socket: JobSocket) -> dict:
+    """
+      Converts a JobSocket to a camelCase dictionary, equal to JobSocket.to_dict().
+
+    :param socket: Job socket.
+    :return: Dictionary with the same keys, in the same order, as the dataclasses_json encoder
+    """
+    return {
+        "alias": socket.alias,
+        "dataPath": socket.data_path,
+        "dataFormat": socket.data_format,
+    }
+
+
+def job_socket_from_dict(socket: dict) -> JobSocket:
+    """
+      Creates a JobSocket from a camelCase dictionary.
+
+    :param socket: Dictionary returned by Beast.
+    :return: JobSocket object
+    """
+    return JobSocket(
+        alias=socket["alias"],
+        data_path=socket["dataPath"],
+        data_format=socket["dataFormat"],
+    )
+
+
+def job_request_to_dict(request: JobRequest) -> dict:
+    """
+      Converts a JobRequest to a camelCase dictionary, equal to JobRequest.to_dict().
+      Serializing the result with json.dumps produces the same bytes as the dataclasses_json path.
+
+    :param request: Beast submission request.
+    :return: Dictionary with the same keys, in the same order, as the dataclasses_json encoder
+    """
+    return {
+        "inputs": [job_socket_to_dict(socket) for socket in request.inputs],
+        "outputs": [job_socket_to_dict(socket) for socket in request.outputs],
+        "extraArgs": dict(request.extra_args),
+        "clientTag": request.client_tag,
+        "expectedParallelism": request.expected_parallelism,
+    }
+
+
+def _spark_submission_details_from_dict(details: dict) -> SparkSubmissionDetails:
+    debug_mode = details["debugMode"]
+    return SparkSubmissionDetails(
+        version=details["version"],
+        execution_group=details["executionGroup"],
+        expected_parallelism=details["expectedParallelism"],
+        flexible_driver=details["flexibleDriver"],
+        additional_driver_node_tolerations=dict(
+            details["additionalDriverNodeTolerations"]
+        ),
+        max_runtime_hours=details["maxRuntimeHours"],
+        debug_mode=None
+        if debug_mode is None
+        else RequestDebugMode(
+            event_log_location=debug_mode["eventLogLocation"],
+            max_size_per_file=debug_mode["maxSizePerFile"],
+        ),
+        submission_mode=details["submissionMode"],
+        extended_code_mount=details["extendedCodeMount"],
+        submission_job_template=details["submissionJobTemplate"],
+        executor_spec_template=details["executorSpecTemplate"],
+        driver_job_retries=details["driverJobRetries"],
+        default_arguments=dict(details["defaultArguments"]),
+        inputs=[job_socket_from_dict(socket) for socket in details["inputs"]],
+        outputs=[job_socket_from_dict(socket) for socket in details["outputs"]],
+        overwrite=details["overwrite"],
+    )
+
+
+def spark_submission_configuration_from_dict(
+    configuration: dict,
+) -> SparkSubmissionConfiguration:
+    """
+      Creates a SparkSubmissionConfiguration from a camelCase dictionary.
+      Payloads the fast path cannot read (missing keys, unexpected nesting) are passed to SparkSubmissionConfiguration.from_dict,
+      so malformed configurations raise the same errors as before.
+
+    :param configuration: Dictionary returned by Beast.
+    :return: SparkSubmissionConfiguration object
+    """
+    try:
+        return SparkSubmissionConfiguration(
+            root_path=configuration["rootPath"],
+            project_name=configuration["projectName"],
+            runnable=configuration["runnable"],
+            submission_details=_spark_submission_details_from_dict(
+                configuration["submissionDetails"]
+            ),
+        )
+    except (KeyError, TypeError, AttributeError):
+        return SparkSubmissionConfiguration.from_dict(configuration)
+
+
+def spark_submission_configuration_from_json(
+    payload: Union[bytes, str],
+) -> SparkSubmissionConfiguration:
+    """
+      Parses a SparkSubmissionConfiguration from a JSON document. Uses orjson for parsing, if it is installed.
+
+    :param payload: JSON document returned by Beast.
+    :return: SparkSubmissionConfiguration object
+    """
+    return spark_submission_configuration_from_dict(loads(payload))
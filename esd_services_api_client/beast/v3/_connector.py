@@ -16,21 +16,90 @@
 #  limitations under the License.
 #
 
+import codecs
 import json
+from concurrent.futures import ThreadPoolExecutor, CancelledError
 from http.client import HTTPException
 from json import JSONDecodeError
-from typing import Optional, Any
+from typing import (
+    Optional,
+    Any,
+    Iterator,
+    Iterable,
+    TextIO,
+    Callable,
+    Dict,
+    TYPE_CHECKING,
+)
 
 import backoff
-from adapta.utils import doze, session_with_retries
+from adapta.utils import session_with_retries
+from requests import RequestException
 from urllib3.exceptions import ProtocolError, HTTPError
 
+from esd_services_api_client.beast.v3._cache import (
+    TerminalRequestCache,
+    ConfigurationCache,
+)
+from esd_services_api_client.beast.v3._polling import (
+    PollingStrategy,
+    FixedPollingStrategy,
+)
+from esd_services_api_client.beast.v3._journal import SubmissionJournal
+from esd_services_api_client.beast.v3._codecs import (
+    job_request_to_dict,
+    spark_submission_configuration_from_json,
+)
 from esd_services_api_client.beast.v3._models import (
     JobRequest,
     BeastJobParams,
     SparkSubmissionConfiguration,
+    JobSubmissionResult,
 )
 from esd_services_api_client.boxer import BoxerTokenAuth
+from esd_services_api_client.common import retry_after_seconds
+from esd_services_api_client.common._metrics import (
+    attach_metrics,
+    default_metrics_provider,
+    instrumented,
+    operation_context,
+    record_backoff,
+)
+
+if TYPE_CHECKING:
+    from esd_services_api_client.beast.v3._watcher import BeastJobWatcher
+
+_MAX_RATE_LIMITED_SUBMISSIONS = 5
+
+
+def _iter_json_strings(chunks: Iterable[bytes]) -> Iterator[str]:
+    """
+      Incrementally decodes a JSON array of strings from a stream of byte chunks.
+
+    :param chunks: Raw response body chunks.
+    :return: An iterator over array elements.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,[]":
+                position += 1
+            if position == len(buffer):
+                break
+            try:
+                element, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # element is split between chunks
+                break
+            yield element
+        buffer = buffer[position:]
+
+    if buffer.strip():
+        raise json.JSONDecodeError("Unexpected end of log stream", buffer, 0)
 
 
 class BeastConnector:
@@ -46,6 +115,10 @@ class BeastConnector:
         lifecycle_check_interval: int = 60,
         auth: Optional[BoxerTokenAuth] = None,
         failure_type: Optional[Exception] = None,
+        lookup_concurrency: int = 8,
+        request_cache: Optional[TerminalRequestCache] = None,
+        polling_strategy: Optional[PollingStrategy] = None,
+        configuration_cache: Optional[ConfigurationCache] = None,
     ):
         """
           Creates a Beast connector, capable of submitting/status tracking etc.
@@ -54,6 +127,10 @@ class BeastConnector:
         :param code_root: Root folder for code deployments.
         :param auth: Boxer-based authentication
         :param lifecycle_check_interval: Time to wait between lifecycle checks for submissions/cancellations etc.
+        :param lookup_concurrency: Maximum number of concurrent request lookups when searching for existing submissions.
+        :param request_cache: Cache for requests in terminal stages. Defaults to an in-memory cache.
+        :param polling_strategy: Strategy for waiting between lifecycle checks. Defaults to a fixed lifecycle_check_interval.
+        :param configuration_cache: Optional cache for deployed SparkJob configurations.
         """
         self.base_url = base_url
         self.code_root = code_root
@@ -70,7 +147,18 @@ class BeastConnector:
         if auth and isinstance(auth, BoxerTokenAuth):
             self.http.hooks["response"].append(auth.get_refresh_hook(self.http))
         self.http.auth = auth
+        self.metrics = default_metrics_provider()
+        attach_metrics(self.http, lambda: self.metrics)
+        # set to a SubmissionJournal to resume jobs by their journaled request instead of a client tag scan
+        self.journal: Optional[SubmissionJournal] = None
         self._failure_type = failure_type or Exception
+        self._lookup_concurrency = lookup_concurrency
+        self._request_cache = request_cache or TerminalRequestCache()
+        # the default strategy follows lifecycle_check_interval, which callers may change after creation
+        self._polling_strategy = polling_strategy or FixedPollingStrategy(
+            lambda: self.lifecycle_check_interval
+        )
+        self._configuration_cache = configuration_cache
         self._version = "v3"
 
     @property
@@ -87,6 +175,10 @@ class BeastConnector:
         code_root="/ecco/dist",
         lifecycle_check_interval: int = 60,
         failure_type: Optional[Exception] = None,
+        lookup_concurrency: int = 8,
+        request_cache: Optional[TerminalRequestCache] = None,
+        polling_strategy: Optional[PollingStrategy] = None,
+        configuration_cache: Optional[ConfigurationCache] = None,
     ) -> "BeastConnector":
         """Creates Beast connector with no authentication.
         This should be used within a hosting clusters."""
@@ -95,17 +187,84 @@ class BeastConnector:
             code_root=code_root,
             lifecycle_check_interval=lifecycle_check_interval,
             failure_type=failure_type,
+            lookup_concurrency=lookup_concurrency,
+            request_cache=request_cache,
+            polling_strategy=polling_strategy,
+            configuration_cache=configuration_cache,
+        )
+
+    @property
+    def request_cache(self) -> TerminalRequestCache:
+        """
+        Returns the cache for requests in terminal stages
+        """
+        return self._request_cache
+
+    def _is_terminal(self, lifecycle_stage: Optional[str]) -> bool:
+        return (
+            lifecycle_stage in self.success_stages
+            or lifecycle_stage in self.failed_stages
         )
 
-    def _submit(self, request: JobRequest, spark_job_name: str) -> (str, str):
-        request_json = request.to_dict()
+    @instrumented("beast.get_request")
+    def _fetch_request(self, request_id: str) -> dict:
+        response = self.http.get(f"{self.base_url}/job/requests/{request_id}")
+        response.raise_for_status()
+        request_record = response.json()
+        if self._is_terminal(request_record["lifeCycleStage"]):
+            self._request_cache.put(request_id, request_record)
+
+        return request_record
+
+    def _read_request(self, request_id: str) -> dict:
+        if (request_record := self._request_cache.get(request_id)) is not None:
+            return request_record
+
+        return self._fetch_request(request_id)
 
-        print(f"Submitting request: {json.dumps(request_json)}")
+    def _read_lifecycle_stage(self, request_id: str) -> str:
+        return self._read_request(request_id)["lifeCycleStage"]
 
-        submission_result = self.http.post(
-            f"{self.base_url}/job/submit/{spark_job_name}", json=request_json
+    @staticmethod
+    def _prepare_request(job_params: BeastJobParams) -> JobRequest:
+        return JobRequest(
+            inputs=job_params.project_inputs,
+            outputs=job_params.project_outputs,
+            extra_args={
+                key: str(value) for (key, value) in job_params.extra_arguments.items()
+            },
+            client_tag=job_params.client_tag,
+            expected_parallelism=job_params.expected_parallelism,
         )
 
+    @instrumented("beast.submit")
+    def _submit(
+        self, request: JobRequest, spark_job_name: str, log_request: bool = True
+    ) -> (str, str):
+        request_json = job_request_to_dict(request)
+
+        if log_request:
+            print(f"Submitting request: {json.dumps(request_json)}")
+        else:
+            print(f"Submitting request for {request.client_tag}")
+
+        for attempt in range(_MAX_RATE_LIMITED_SUBMISSIONS + 1):
+            submission_result = self.http.post(
+                f"{self.base_url}/job/submit/{spark_job_name}", json=request_json
+            )
+            if (
+                submission_result.status_code != 429
+                or attempt == _MAX_RATE_LIMITED_SUBMISSIONS
+            ):
+                break
+
+            # submissions are not retried by the session, so rate limiting is handled here
+            retry_after = retry_after_seconds(submission_result, default=2**attempt)
+            print(
+                f"Beast is rate limiting submissions, retrying {request.client_tag} in {retry_after:0.1f} seconds"
+            )
+            self._polling_strategy.sleep(retry_after)
+
         if submission_result.status_code == 202 and (
             submission_json := submission_result.json()
         ):
@@ -117,8 +276,50 @@ class BeastConnector:
                 f"Error {submission_result.status_code} when submitting a request: {submission_result.text}"
             )
 
+        self._journal_stage(
+            request.client_tag, submission_json["id"], submission_json["lifeCycleStage"]
+        )
         return submission_json["id"], submission_json["lifeCycleStage"]
 
+    def _journal_stage(
+        self, client_tag: str, request_id: str, lifecycle_stage: Optional[str]
+    ) -> None:
+        if self.journal is not None:
+            self.journal.record(client_tag, request_id, lifecycle_stage)
+
+    def _resume_submission(self, submitted_tag: str) -> (Optional[str], Optional[str]):
+        """
+          Finds the running submission of a client tag, from the journal if it has an active entry for the tag,
+          otherwise by scanning all submissions of the tag.
+
+        :return: Request identifier and lifecycle stage of the running submission, or None, None
+        """
+        entry = self.journal.get(submitted_tag) if self.journal is not None else None
+        if entry is not None and not self._is_terminal(entry.last_stage):
+            try:
+                request_lifecycle = self._read_lifecycle_stage(entry.request_id)
+                if not self._is_terminal(request_lifecycle):
+                    print(
+                        f"Found a journaled submission of {submitted_tag}: {entry.request_id}."
+                    )
+                    self._journal_stage(
+                        submitted_tag, entry.request_id, request_lifecycle
+                    )
+                    return entry.request_id, request_lifecycle
+            except (RequestException, HTTPError, KeyError, JSONDecodeError) as error:
+                print(
+                    f"Failed to read journaled submission {entry.request_id} of {submitted_tag}: {error}"
+                )
+
+        (request_id, request_lifecycle) = self._existing_submission(
+            submitted_tag=submitted_tag
+        )
+        if request_id:
+            self._journal_stage(submitted_tag, request_id, request_lifecycle)
+
+        return request_id, request_lifecycle
+
+    @instrumented("beast.existing_submission")
     @backoff.on_exception(
         wait_gen=backoff.expo,
         exception=(
@@ -133,6 +334,7 @@ class BeastConnector:
         ),
         max_time=300,
         raise_on_giveup=True,
+        on_backoff=record_backoff,
     )
     def _existing_submission(
         self, submitted_tag: str
@@ -147,23 +349,29 @@ class BeastConnector:
             print(f"No previous submissions found for {submitted_tag}")
             return None, None
 
+        # terminal stages never change, so only requests not known to be terminal are looked up
+        pending_submissions = [
+            submission_request_id
+            for submission_request_id in existing_submissions
+            if self._request_cache.get(submission_request_id) is None
+        ]
         running_submissions = []
-        for submission_request_id in existing_submissions:
-            response = self.http.get(
-                f"{self.base_url}/job/requests/{submission_request_id}"
-            )
-            response.raise_for_status()
-            submission_lifecycle = response.json()["lifeCycleStage"]
-            if (
-                submission_lifecycle not in self.success_stages
-                and submission_lifecycle not in self.failed_stages
-            ):
-                print(
-                    f"Found a running submission of {submitted_tag}: {submission_request_id}."
-                )
-                running_submissions.append(
-                    (submission_request_id, submission_lifecycle)
-                )
+        if pending_submissions:
+            with ThreadPoolExecutor(
+                max_workers=min(self._lookup_concurrency, len(pending_submissions))
+            ) as lookup_pool:
+                for submission_request_id, submission_record in zip(
+                    pending_submissions,
+                    lookup_pool.map(self._fetch_request, pending_submissions),
+                ):
+                    submission_lifecycle = submission_record["lifeCycleStage"]
+                    if not self._is_terminal(submission_lifecycle):
+                        print(
+                            f"Found a running submission of {submitted_tag}: {submission_request_id}."
+                        )
+                        running_submissions.append(
+                            (submission_request_id, submission_lifecycle)
+                        )
 
         if len(running_submissions) == 0:
             print("None of found submissions are active")
@@ -176,44 +384,99 @@ class BeastConnector:
             f"Fatal: more than one submission of {submitted_tag} is running: {running_submissions}. Please review their status restart/terminate the task accordingly"
         )
 
-    def run_job(self, job_params: BeastJobParams, job_name: str):
+    def _tail_logs(
+        self, request_id: str, since_line: int, log_sink: Callable[[str], None]
+    ) -> int:
+        """
+          Sends log lines produced since the last poll to the sink. Log retrieval errors are reported, but do not interrupt the job watch.
+
+        :return: Number of log lines consumed so far.
+        """
+        try:
+            for line in self.iter_logs(request_id, since_line=since_line):
+                log_sink(line)
+                since_line += 1
+        except (RequestException, HTTPError, JSONDecodeError) as log_error:
+            print(f"Failed to read logs for {request_id}: {log_error}")
+
+        return since_line
+
+    def run_job(
+        self,
+        job_params: BeastJobParams,
+        job_name: str,
+        tail_logs: bool = False,
+        log_sink: Optional[Callable[[str], None]] = None,
+        watcher: Optional["BeastJobWatcher"] = None,
+    ):
         """
           Runs a job through Beast
 
         :param job_params: Parameters for Beast Job body.
         :param job_name: Name of the SparkJob to invoke.
+        :param tail_logs: If set to True, new job log lines are fetched on every lifecycle check.
+        :param log_sink: Receives job log lines when tail_logs is set. Defaults to print.
+        :param watcher: Optional BeastJobWatcher, e.g. one receiving pushed lifecycle events.
+          If provided, the job is awaited through the watcher. It is polled by this call only while the watcher is not running.
         :return: A JobRequest for Beast.
         """
 
-        (request_id, request_lifecycle) = self._existing_submission(
+        (request_id, request_lifecycle) = self._resume_submission(
             submitted_tag=job_params.client_tag
         )
 
+        submitted_at = None
         if request_id:
             print(f"Resuming watch for {request_id}")
 
         if not request_id:
-            prepared_arguments = {
-                key: str(value) for (key, value) in job_params.extra_arguments.items()
-            }
-
-            submit_request = JobRequest(
-                inputs=job_params.project_inputs,
-                outputs=job_params.project_outputs,
-                extra_args=prepared_arguments,
-                client_tag=job_params.client_tag,
-                expected_parallelism=job_params.expected_parallelism,
+            (request_id, request_lifecycle) = self._submit(
+                self._prepare_request(job_params), job_name
             )
+            submitted_at = self._polling_strategy.clock()
 
-            (request_id, request_lifecycle) = self._submit(submit_request, job_name)
-
+        poll_intervals = self._polling_strategy.intervals(job_params.client_tag)
+        completion = (
+            watcher.watch(request_id)
+            if watcher is not None and not self._is_terminal(request_lifecycle)
+            else None
+        )
+        log_offset = 0
         while (
             request_lifecycle not in self.success_stages
             and request_lifecycle not in self.failed_stages
         ):
-            doze(self.lifecycle_check_interval)
-            request_lifecycle = self.get_request_lifecycle_stage(request_id)
-            print(f"Request: {request_id}, current state: {request_lifecycle}")
+            previous_lifecycle = request_lifecycle
+            if completion is None:
+                self._polling_strategy.sleep(next(poll_intervals))
+                request_lifecycle = self.get_request_lifecycle_stage(request_id)
+                print(f"Request: {request_id}, current state: {request_lifecycle}")
+            else:
+                # waits on the polling schedule, to tail logs and to notice a watcher that stopped polling
+                try:
+                    request_lifecycle = completion.result(timeout=next(poll_intervals))
+                except TimeoutError:
+                    if not watcher.running:
+                        request_lifecycle = self.get_request_lifecycle_stage(request_id)
+                except CancelledError:
+                    print(f"Watcher stopped tracking {request_id}, polling it directly")
+                    completion = None
+                    continue
+                print(f"Request: {request_id}, current state: {request_lifecycle}")
+            if (
+                request_lifecycle is not None
+                and request_lifecycle != previous_lifecycle
+            ):
+                self._journal_stage(
+                    job_params.client_tag, request_id, request_lifecycle
+                )
+            if tail_logs:
+                log_offset = self._tail_logs(request_id, log_offset, log_sink or print)
+
+        if submitted_at is not None:
+            self._polling_strategy.record_runtime(
+                job_params.client_tag, self._polling_strategy.clock() - submitted_at
+            )
 
         if request_lifecycle in self.failed_stages:
             raise self._failure_type(
@@ -243,26 +506,21 @@ class BeastConnector:
         max_time=300,
         raise_on_giveup=False,
         on_giveup=_report_backoff_failure,
+        on_backoff=record_backoff,
     )
     def get_request_lifecycle_stage(self, request_id: str) -> Optional[str]:
         """
           Returns a lifecycle stage for the given request. Returns None in case error retry fails to resolve within given timeout.
         :param request_id: A request identifier to read lifecycle stage for.
         """
-        response = self.http.get(f"{self.base_url}/job/requests/{request_id}")
-        response.raise_for_status()
-
-        return response.json()["lifeCycleStage"]
+        return self._read_lifecycle_stage(request_id)
 
     def get_request_runtime_info(self, request_id: str) -> Optional[dict]:
         """
           Returns the runtime information for the given request. Returns None in case error retry fails to resolve within given timeout.
         :param request_id: A request identifier to read runtime info for.
         """
-        response = self.http.get(f"{self.base_url}/job/requests/{request_id}")
-        response.raise_for_status()
-
-        return response.json()
+        return self._read_request(request_id)
 
     def start_job(self, job_params: BeastJobParams, job_name: str) -> Optional[str]:
         """
@@ -273,25 +531,83 @@ class BeastConnector:
         :return: A JobRequest for Beast.
         """
 
-        (request_id, _) = self._existing_submission(submitted_tag=job_params.client_tag)
+        (request_id, _) = self._resume_submission(submitted_tag=job_params.client_tag)
 
         if not request_id:
-            prepared_arguments = {
-                key: str(value) for (key, value) in job_params.extra_arguments.items()
-            }
+            request_id, _ = self._submit(self._prepare_request(job_params), job_name)
+
+        return request_id
+
+    def _start_one(
+        self, job_params: BeastJobParams, job_name: str
+    ) -> JobSubmissionResult:
+        try:
+            (request_id, request_lifecycle) = self._resume_submission(
+                submitted_tag=job_params.client_tag
+            )
+            if request_id:
+                return JobSubmissionResult(
+                    client_tag=job_params.client_tag,
+                    request_id=request_id,
+                    lifecycle_stage=request_lifecycle,
+                )
 
-            submit_request = JobRequest(
-                inputs=job_params.project_inputs,
-                outputs=job_params.project_outputs,
-                extra_args=prepared_arguments,
+            (request_id, request_lifecycle) = self._submit(
+                self._prepare_request(job_params), job_name, log_request=False
+            )
+            return JobSubmissionResult(
                 client_tag=job_params.client_tag,
-                expected_parallelism=job_params.expected_parallelism,
+                request_id=request_id,
+                lifecycle_stage=request_lifecycle,
+                submitted=True,
+            )
+        except Exception as submission_error:  # pylint: disable=broad-exception-caught
+            print(f"Failed to start {job_params.client_tag}: {submission_error}")
+            return JobSubmissionResult(
+                client_tag=job_params.client_tag, error=submission_error
             )
 
-            request_id, _ = self._submit(submit_request, job_name)
+    def submit_many(
+        self,
+        job_params: Iterable[BeastJobParams],
+        job_name: str,
+        concurrency: int = 8,
+    ) -> Dict[str, JobSubmissionResult]:
+        """
+          Starts many jobs through Beast, e.g. for a backfill. Each client tag is handled as in start_job:
+          a running submission with the same tag is reused, otherwise a new request is submitted.
+          Duplicate client tags are submitted once, using the first parameters provided for the tag.
+          A failure of one tag does not stop others and is reported in its result.
 
-        return request_id
+        :param job_params: Parameters for Beast Job bodies.
+        :param job_name: Name of the SparkJob to invoke.
+        :param concurrency: Maximum number of client tags processed at the same time.
+        :return: Submission result for each client tag, in order of appearance
+        """
+        unique_params: Dict[str, BeastJobParams] = {}
+        for params in job_params:
+            if params.client_tag in unique_params:
+                print(f"Skipping duplicate submission of {params.client_tag}")
+                continue
+            unique_params[params.client_tag] = params
+
+        if not unique_params:
+            return {}
+
+        with ThreadPoolExecutor(
+            max_workers=min(concurrency, len(unique_params))
+        ) as submission_pool:
+            return dict(
+                zip(
+                    unique_params,
+                    submission_pool.map(
+                        lambda params: self._start_one(params, job_name),
+                        unique_params.values(),
+                    ),
+                )
+            )
 
+    @instrumented("beast.get_configuration")
     def get_configuration(
         self, configuration_name: str
     ) -> Optional[SparkSubmissionConfiguration]:
@@ -300,14 +616,52 @@ class BeastConnector:
         :param configuration_name: Name of the configuration to find
         :return: A SparkSubmissionConfiguration object, if found, or None
         """
-        response = self.http.get(f"{self.base_url}/job/deployed/{configuration_name}")
+        if self._configuration_cache is None:
+            response = self.http.get(
+                f"{self.base_url}/job/deployed/{configuration_name}"
+            )
+            if response.status_code == 404:
+                return None
+            if not response.ok:
+                response.raise_for_status()
+
+            return spark_submission_configuration_from_json(response.content)
+
+        cached = self._configuration_cache.get(configuration_name)
+        if cached and self._configuration_cache.is_fresh(cached):
+            return cached.configuration
+
+        response = self.http.get(
+            f"{self.base_url}/job/deployed/{configuration_name}",
+            headers={"If-None-Match": cached.etag} if cached and cached.etag else None,
+        )
+        if response.status_code == 304 and cached:
+            return self._configuration_cache.put(
+                configuration_name, cached.configuration, cached.etag
+            ).configuration
         if response.status_code == 404:
-            return None
+            return self._configuration_cache.put(configuration_name, None).configuration
         if not response.ok:
             response.raise_for_status()
 
-        return SparkSubmissionConfiguration.from_dict(response.json())
+        return self._configuration_cache.put(
+            configuration_name,
+            spark_submission_configuration_from_json(response.content),
+            response.headers.get("ETag"),
+        ).configuration
+
+    def invalidate_configuration(
+        self, configuration_name: Optional[str] = None
+    ) -> None:
+        """
+          Drops cached SparkJob configurations, so they are read from Beast on the next get_configuration call.
+
+        :param configuration_name: Name of the configuration to drop. If not provided, all configurations are dropped.
+        """
+        if self._configuration_cache is not None:
+            self._configuration_cache.invalidate(configuration_name)
 
+    @instrumented("beast.get_logs")
     def get_logs(self, request_id: str) -> Optional[str]:
         """
           Returns logs for a running or a completed submission.
@@ -322,3 +676,46 @@ class BeastConnector:
             response.raise_for_status()
 
         return "\n".join(response.json())
+
+    def iter_logs(self, request_id: str, since_line: int = 0) -> Iterator[str]:
+        """
+          Lazily reads log lines for a running or a completed submission, without loading the whole log in memory.
+          Beast always sends the full log, so lines before since_line are skipped while streaming.
+
+        :param request_id: Submission request identifier.
+        :param since_line: Number of lines to skip from the start of the log, e.g. lines already read while tailing a running job.
+        :return: An iterator over log lines. Empty if logs are not found.
+        """
+        # the operation is only pushed around the request, as the generator may be resumed from other code
+        with operation_context("beast.iter_logs"):
+            response = self.http.get(
+                f"{self.base_url}/job/logs/{request_id}", stream=True
+            )
+        with response:
+            if response.status_code == 404:
+                return
+            response.raise_for_status()
+
+            for line_number, line in enumerate(
+                _iter_json_strings(response.iter_content(chunk_size=65536))
+            ):
+                if line_number >= since_line:
+                    yield line
+
+    @instrumented("beast.write_logs")
+    def write_logs(self, request_id: str, output: TextIO, since_line: int = 0) -> int:
+        """
+          Streams logs for a running or a completed submission into a text file handle.
+
+        :param request_id: Submission request identifier.
+        :param output: Writable text stream.
+        :param since_line: Number of lines to skip from the start of the log.
+        :return: Number of lines written.
+        """
+        lines_written = 0
+        for line in self.iter_logs(request_id, since_line=since_line):
+            output.write(line)
+            output.write("\n")
+            lines_written += 1
+
+        return lines_written
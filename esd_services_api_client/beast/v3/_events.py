@@ -0,0 +1,172 @@
+"""
+  Receiver for Beast request lifecycle events pushed over HTTP.
+"""
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import ipaddress
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+LifecycleListener = Callable[[str, str], None]
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class LifecycleEventReceiver:
+    """
+    Embedded HTTP server that receives lifecycle events of Beast requests and passes them to subscribed listeners.
+    An event is a POST to `path` with a request record, or a list of request records, as returned by Beast:
+    a JSON object with at least `id` and `lifeCycleStage`.
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        path: str = "/beast/lifecycle",
+        token: Optional[str] = None,
+    ):
+        """
+          Creates a receiver, listening once started.
+
+        :param host: Interface to listen on. Defaults to loopback, so only local senders can post events.
+        :param port: Port to listen on. A random free port is used by default.
+        :param path: URL path events are posted to.
+        :param token: If set, events must carry an `Authorization: Bearer <token>` header. Required for non-loopback hosts.
+        """
+        if token is None and not _is_loopback(host):
+            raise ValueError(
+                f"A token is required to receive lifecycle events on {host}, as every forged event triggers a read from Beast"
+            )
+
+        self._path = path
+        self._token = token
+        self._listeners: list[LifecycleListener] = []
+        self._server = _Server((host, port), self._handler())
+        # restarts bind the port picked on creation, so the URL given to event senders stays valid
+        self._address = self._server.server_address[:2]
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """
+        URL events are posted to, as seen from this host
+        """
+        host, port = self._address
+        return f"http://{'127.0.0.1' if host == '0.0.0.0' else host}:{port}{self._path}"
+
+    def subscribe(self, listener: LifecycleListener) -> None:
+        """
+          Registers a listener for received events.
+
+        :param listener: Callable invoked with (request_id, lifecycle_stage) for every received request record.
+        """
+        self._listeners.append(listener)
+
+    def start(self) -> None:
+        """
+        Starts serving in a background thread.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+
+        if self._closed:
+            self._server = _Server(self._address, self._handler())
+            self._closed = False
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="beast-events", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops the server and releases its port. The receiver can be started again on the same port.
+        """
+        if self._thread:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+        self._closed = True
+
+    def __enter__(self) -> "LifecycleEventReceiver":
+        self.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.stop()
+
+    def _dispatch(self, payload: object) -> None:
+        records = payload if isinstance(payload, list) else [payload]
+        for record in records:
+            for listener in self._listeners:
+                listener(record["id"], record["lifeCycleStage"])
+
+    def _handler(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """
+            Accepts lifecycle events.
+            """
+
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *_):
+                pass
+
+            def _reply(self, status: int) -> None:
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):  # pylint: disable=invalid-name
+                """
+                Passes a posted event to listeners.
+                """
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if self.path != receiver._path:
+                    self._reply(404)
+                    return
+                if receiver._token is not None and self.headers.get(
+                    "Authorization"
+                ) != (f"Bearer {receiver._token}"):
+                    self._reply(401)
+                    return
+                try:
+                    receiver._dispatch(json.loads(body))
+                except (ValueError, KeyError, TypeError):
+                    self._reply(400)
+                    return
+
+                self._reply(204)
+
+        return Handler
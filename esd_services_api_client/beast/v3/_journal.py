@@ -0,0 +1,101 @@
+"""
+  Local journal of Beast submissions, used to resume watching jobs after a process restart.
+"""
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class JournalEntry:
+    """
+    Latest known submission of a client tag
+    """
+
+    client_tag: str
+    request_id: str
+    last_stage: Optional[str]
+    updated_at: float
+
+
+class SubmissionJournal:
+    """
+    SQLite-backed journal of the latest request submitted or resumed for each client tag, and its last observed lifecycle stage.
+    A connector with a journal resumes a job by reading the journaled request directly,
+    instead of listing all submissions of the tag and reading each of them.
+    """
+
+    def __init__(self, path: str):
+        """
+          Opens a journal, creating the SQLite file if it does not exist.
+
+        :param path: Path to the SQLite file. Should be on storage that survives restarts of the process, e.g. a persistent volume.
+        """
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = sqlite3.connect(
+            path, check_same_thread=False
+        )
+        # write-ahead logging keeps committed entries across crashes without a full sync on every write
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS submissions (client_tag TEXT PRIMARY KEY, request_id TEXT NOT NULL, last_stage TEXT, updated_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, client_tag: str) -> Optional[JournalEntry]:
+        """
+          Reads the latest submission of a client tag.
+
+        :param client_tag: Client-assigned identifier of the request.
+        :return: A journal entry, if the tag was recorded, or None
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT request_id, last_stage, updated_at FROM submissions WHERE client_tag = ?",
+                (client_tag,),
+            ).fetchone()
+
+        return JournalEntry(client_tag, *row) if row else None
+
+    def record(
+        self, client_tag: str, request_id: str, last_stage: Optional[str]
+    ) -> None:
+        """
+          Records the request watched for a client tag, replacing any earlier entry of the tag.
+
+        :param client_tag: Client-assigned identifier of the request.
+        :param request_id: Request identifier assigned by Beast.
+        :param last_stage: Last observed lifecycle stage of the request.
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO submissions (client_tag, request_id, last_stage, updated_at) VALUES (?, ?, ?, ?)",
+                (client_tag, request_id, last_stage, time.time()),
+            )
+            self._db.commit()
+
+    def close(self) -> None:
+        """
+        Closes the SQLite file.
+        """
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -21,7 +21,6 @@ from dataclasses import dataclass, field
 from typing import List, Dict, Union, Optional
 from warnings import warn
 
-from cryptography.fernet import Fernet
 from dataclasses_json import dataclass_json, LetterCase, DataClassJsonMixin
 
 
@@ -141,6 +140,11 @@ class ArgumentValue:
                 "Encryption key not found, but a value is set to be encrypted. Either disable encryption or map RUNTIME_ENCRYPTION_KEY on this container from airflow secrets."
             )
 
+        # imported on use, as few jobs encrypt arguments
+        from cryptography.fernet import (  # pylint: disable=import-outside-toplevel
+            Fernet,
+        )
+
         fernet = Fernet(encryption_key)
         return fernet.encrypt(value.encode("utf-8")).decode("utf-8")
 
@@ -232,3 +236,23 @@ class SparkSubmissionConfiguration(DataClassJsonMixin):
     project_name: str
     runnable: str
     submission_details: SparkSubmissionDetails
+
+
+@dataclass
+class JobSubmissionResult:
+    """
+    Outcome of a single client tag in a bulk submission
+    """
+
+    client_tag: str
+    request_id: Optional[str] = None
+    lifecycle_stage: Optional[str] = None
+    submitted: bool = False
+    error: Optional[Exception] = None
+
+    @property
+    def succeeded(self) -> bool:
+        """
+        True if a request is running for the client tag, either submitted now or found among existing submissions
+        """
+        return self.error is None and self.request_id is not None
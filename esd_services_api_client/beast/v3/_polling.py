@@ -0,0 +1,152 @@
+"""
+  Polling strategies for Beast request lifecycle checks.
+"""
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Iterator, Optional, Dict, Union
+
+from adapta.utils import doze
+
+
+class PollingStrategy(ABC):
+    """
+    Defines how long to wait between lifecycle checks of a Beast request.
+    """
+
+    def __init__(
+        self,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = doze,
+    ):
+        """
+          Creates a polling strategy.
+
+        :param clock: Monotonic clock returning time in seconds, used to measure job runtime.
+        :param sleep: Function that blocks for the given number of seconds.
+        """
+        self.clock = clock
+        self.sleep = sleep
+
+    @abstractmethod
+    def intervals(self, client_tag: str) -> Iterator[float]:
+        """
+          Generates wait times before each lifecycle check of a request.
+
+        :param client_tag: Client tag of the tracked request.
+        :return: An infinite iterator of wait times in seconds.
+        """
+
+    def record_runtime(self, client_tag: str, runtime: float) -> None:
+        """
+          Reports observed runtime of a completed request. Ignored by default.
+
+        :param client_tag: Client tag of the completed request.
+        :param runtime: Time in seconds between submission and completion.
+        """
+
+
+class FixedPollingStrategy(PollingStrategy):
+    """
+    Waits the same time between all lifecycle checks.
+    """
+
+    def __init__(self, interval: Union[float, Callable[[], float]], **kwargs):
+        """
+          Creates a fixed polling strategy.
+
+        :param interval: Time to wait between lifecycle checks, or a function returning it, read before every wait.
+        """
+        super().__init__(**kwargs)
+        self._interval = interval
+
+    def intervals(self, client_tag: str) -> Iterator[float]:
+        while True:
+            yield self._interval() if callable(self._interval) else self._interval
+
+
+class AdaptivePollingStrategy(PollingStrategy):
+    """
+    Polls often right after submission and backs off exponentially, up to a maximum interval.
+    If runtime of previous requests with the same client tag is known, the first check is delayed until the request is expected to finish.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_interval: float = 5,
+        max_interval: float = 300,
+        factor: float = 2,
+        jitter: float = 0.1,
+        runtime_hint_ratio: float = 0.8,
+        rng: Optional[random.Random] = None,
+        **kwargs,
+    ):
+        """
+          Creates an adaptive polling strategy.
+
+        :param initial_interval: Time to wait before the first check.
+        :param max_interval: Upper bound for time between two checks.
+        :param factor: Multiplier applied to the interval after each check.
+        :param jitter: Relative random deviation applied to each interval, to avoid synchronized polling.
+        :param runtime_hint_ratio: Fraction of the historical runtime to wait before starting to poll.
+        :param rng: Random number generator used for jitter.
+        """
+        super().__init__(**kwargs)
+        self._initial_interval = initial_interval
+        self._max_interval = max_interval
+        self._factor = factor
+        self._jitter = jitter
+        self._runtime_hint_ratio = runtime_hint_ratio
+        self._rng = rng or random.Random()
+        self._runtimes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _with_jitter(self, interval: float) -> float:
+        return interval * self._rng.uniform(1 - self._jitter, 1 + self._jitter)
+
+    def runtime_hint(self, client_tag: str) -> Optional[float]:
+        """
+          Returns the smoothed historical runtime for a client tag.
+
+        :param client_tag: Client tag of a request.
+        :return: Runtime in seconds, if known, or None
+        """
+        with self._lock:
+            return self._runtimes.get(client_tag)
+
+    def record_runtime(self, client_tag: str, runtime: float) -> None:
+        with self._lock:
+            previous = self._runtimes.get(client_tag)
+            self._runtimes[client_tag] = (
+                runtime if previous is None else (previous + runtime) / 2
+            )
+
+    def intervals(self, client_tag: str) -> Iterator[float]:
+        expected_wait = (self.runtime_hint(client_tag) or 0) * self._runtime_hint_ratio
+        while expected_wait > 0:
+            interval = min(expected_wait, self._max_interval)
+            expected_wait -= interval
+            yield self._with_jitter(interval)
+
+        interval = self._initial_interval
+        while True:
+            yield self._with_jitter(interval)
+            interval = min(interval * self._factor, self._max_interval)
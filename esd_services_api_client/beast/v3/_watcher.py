@@ -0,0 +1,224 @@
+"""
+  Shared lifecycle watcher for many Beast requests.
+"""
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from esd_services_api_client.beast.v3._connector import BeastConnector
+from esd_services_api_client.beast.v3._events import LifecycleEventReceiver
+
+
+class BeastJobWatcher:
+    """
+    Tracks lifecycle stages of many Beast requests on a single polling schedule.
+    Each tracked request is exposed as a Future that resolves to its terminal lifecycle stage.
+    With an event receiver, requests are resolved as soon as a terminal stage is pushed, and polling only acts as a safety net.
+    """
+
+    def __init__(
+        self,
+        connector: BeastConnector,
+        *,
+        check_interval: Optional[float] = None,
+        max_in_flight: int = 16,
+        events: Optional[LifecycleEventReceiver] = None,
+    ):
+        """
+          Creates a watcher for Beast requests.
+
+        :param connector: Beast connector used to read request lifecycle stages.
+        :param check_interval: Time to wait between polling rounds. Defaults to connector's lifecycle_check_interval.
+        :param max_in_flight: Maximum number of concurrent lifecycle requests in a single polling round.
+        :param events: Optional receiver of pushed lifecycle events, started and stopped with the watcher.
+          When events are pushed, check_interval can be set much longer than the expected job runtime.
+        """
+        self._connector = connector
+        self._fixed_check_interval = check_interval
+        self._max_in_flight = max_in_flight
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._tracked: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._events = events
+        if events is not None:
+            events.subscribe(self.notify)
+
+    def __enter__(self) -> "BeastJobWatcher":
+        self.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.stop()
+
+    @property
+    def _check_interval(self) -> float:
+        # read on every round, so changes of the connector's interval apply to a running watcher
+        if self._fixed_check_interval is not None:
+            return self._fixed_check_interval
+        return self._connector.lifecycle_check_interval
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self._max_in_flight, thread_name_prefix="beast-watcher"
+                )
+            return self._pool
+
+    @property
+    def tracked(self) -> list[str]:
+        """
+        Request identifiers that have not reached a terminal stage yet.
+        """
+        with self._lock:
+            return list(self._tracked.keys())
+
+    @property
+    def running(self) -> bool:
+        """
+        True if background polling is active.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def watch(
+        self, request_id: str, callback: Optional[Callable[[str, str], None]] = None
+    ) -> Future:
+        """
+          Adds a request to the watch set.
+
+        :param request_id: A request identifier to track.
+        :param callback: Optional callable invoked with (request_id, lifecycle_stage) once the request reaches a terminal stage.
+        :return: A Future resolving to the terminal lifecycle stage. If the request is already tracked, its existing Future is returned.
+        """
+        with self._lock:
+            future = self._tracked.get(request_id)
+            if future is None:
+                future = Future()
+                self._tracked[request_id] = future
+
+        if callback:
+            future.add_done_callback(
+                lambda done: None
+                if done.cancelled()
+                else callback(request_id, done.result())
+            )
+
+        return future
+
+    def _resolve(self, request_id: str, lifecycle_stage: Optional[str]) -> None:
+        if (
+            lifecycle_stage not in self._connector.success_stages
+            and lifecycle_stage not in self._connector.failed_stages
+        ):
+            return
+
+        with self._lock:
+            future = self._tracked.pop(request_id, None)
+
+        if future is not None and not future.cancelled():
+            future.set_result(lifecycle_stage)
+
+    def _read_lifecycle_stage(self, request_id: str) -> Optional[str]:
+        try:
+            return self._connector.get_request_lifecycle_stage(request_id)
+        except Exception as lookup_error:  # pylint: disable=broad-exception-caught
+            print(
+                f"Failed to read lifecycle stage of {request_id}, retrying on the next polling round: {lookup_error}"
+            )
+            return None
+
+    def _confirm(self, request_id: str) -> None:
+        self._resolve(request_id, self._read_lifecycle_stage(request_id))
+
+    def notify(self, request_id: str, lifecycle_stage: str) -> None:
+        """
+          Handles a pushed lifecycle event. A terminal stage of a tracked request is confirmed with a single read from Beast
+          before its Future is resolved, so events cannot complete requests on their own.
+
+        :param request_id: Request identifier.
+        :param lifecycle_stage: Lifecycle stage reported by the event.
+        """
+        with self._lock:
+            is_tracked = request_id in self._tracked
+
+        if is_tracked and (
+            lifecycle_stage in self._connector.success_stages
+            or lifecycle_stage in self._connector.failed_stages
+        ):
+            self._executor().submit(self._confirm, request_id)
+
+    def poll_once(self) -> None:
+        """
+        Runs a single polling round over all tracked requests, with at most max_in_flight requests running concurrently.
+        """
+        request_ids = self.tracked
+        for request_id, lifecycle_stage in zip(
+            request_ids,
+            self._executor().map(self._read_lifecycle_stage, request_ids),
+        ):
+            print(f"Request: {request_id}, current state: {lifecycle_stage}")
+            self._resolve(request_id, lifecycle_stage)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._check_interval):
+            try:
+                self.poll_once()
+            except Exception as poll_error:  # pylint: disable=broad-exception-caught
+                # a failed round must not stop the watcher, or tracked futures would never resolve
+                print(f"Polling round failed: {poll_error}")
+
+    def start(self) -> None:
+        """
+        Starts polling in a background thread.
+        """
+        if self.running:
+            return
+
+        if self._events is not None:
+            self._events.start()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="beast-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, cancel_pending: bool = False) -> None:
+        """
+          Stops background polling and the worker threads of the watcher.
+
+        :param cancel_pending: If set to True, futures of requests that have not completed yet are cancelled.
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if self._events is not None:
+            self._events.stop()
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+        if cancel_pending:
+            with self._lock:
+                pending = list(self._tracked.values())
+                self._tracked.clear()
+            for future in pending:
+                future.cancel()
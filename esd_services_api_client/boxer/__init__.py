@@ -1,5 +1,5 @@
 """
- Import index.
+ Import index. Names are loaded from submodules on first access, so importing the package stays cheap.
 """
 
 #  Copyright (c) 2023-2024. ECCO Sneaks & Data
@@ -17,6 +17,42 @@
 #  limitations under the License.
 #
 
-from esd_services_api_client.boxer._models import *
-from esd_services_api_client.boxer._connector import *
-from esd_services_api_client.boxer._auth import *
+from typing import TYPE_CHECKING
+
+from esd_services_api_client._lazy import lazy_exports
+
+_EXPORTS = {
+    "BoxerToken": "_models",
+    "Claim": "_models",
+    "ClaimPayload": "_models",
+    "ClaimResponse": "_models",
+    "ClaimChange": "_models",
+    "ClaimChangeResult": "_models",
+    "ClaimSyncPlan": "_models",
+    "ClaimSyncReport": "_models",
+    "BoxerClaimConnector": "_connector",
+    "BoxerConnector": "_connector",
+    "select_authentication": "_connector",
+    "get_kubernetes_token": "_connector",
+    "BoxerAuth": "_auth",
+    "BoxerTokenAuth": "_auth",
+    "ExternalAuthBase": "_auth",
+    "ExternalTokenAuth": "_auth",
+    "RefreshableExternalTokenAuth": "_auth",
+    "BoxerTokenProvider": "_base",
+    "BoxerTokenStore": "_base",
+    "FileTokenStore": "_token_store",
+    "ClaimCache": "_cache",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from esd_services_api_client.boxer._models import *
+    from esd_services_api_client.boxer._connector import *
+    from esd_services_api_client.boxer._auth import *
+    from esd_services_api_client.boxer._base import BoxerTokenProvider, BoxerTokenStore
+    from esd_services_api_client.boxer._token_store import FileTokenStore
+    from esd_services_api_client.boxer._cache import ClaimCache
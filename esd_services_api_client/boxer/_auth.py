@@ -18,46 +18,152 @@
 #
 
 import base64
+import hashlib
+import threading
+import time
 from abc import abstractmethod
-from functools import partial
-from typing import Callable, Any
+from functools import partial, lru_cache
+from typing import Callable, Any, Optional
 
 import requests
-from Crypto.Hash.SHA256 import new as sha256_get_instance
-from Crypto.PublicKey import RSA
-from Crypto.Signature.PKCS1_v1_5 import new as signature_factory
 from requests import Session, Response, PreparedRequest
 from requests.auth import AuthBase
 from typing_extensions import Unpack
 
-from esd_services_api_client.boxer._base import BoxerTokenProvider
-from esd_services_api_client.boxer._models import BoxerToken
+from esd_services_api_client.boxer._base import BoxerTokenProvider, BoxerTokenStore
+from esd_services_api_client.boxer._models import BoxerToken, decode_jwt_claims
+
+
+class _SingleFlightToken:
+    """
+    Token shared between threads. Concurrent refreshes of the same rejected token result in a single fetch,
+    while other callers wait for and reuse its result.
+    """
+
+    def __init__(self, fetch: Callable[[Optional[str]], Any]):
+        """
+        :param fetch: Obtains a new token. Receives the text of the rejected token, if the fetch is caused by a rejection.
+        """
+        self._fetch = fetch
+        self._token = None
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> Optional[Any]:
+        """
+        Currently held token, if any
+        """
+        return self._token
+
+    def get(self, expired: Callable[[Any], bool] = lambda _: False) -> Any:
+        """
+          Returns the held token, fetching a new one if there is none or it is expired.
+
+        :param expired: Predicate that checks whether a token must be replaced.
+        """
+        token = self._token
+        if token is not None and not expired(token):
+            return token
+
+        with self._lock:
+            if self._token is None or expired(self._token):
+                self._token = self._fetch(None)
+            return self._token
+
+    def observe(self, token: Any) -> None:
+        """
+          Records a token obtained outside of this holder, so a later rejection of it is recognized.
+
+        :param token: Token in use.
+        """
+        with self._lock:
+            self._token = token
+
+    def refresh(self, rejected: Optional[str] = None) -> Any:
+        """
+          Fetches a new token.
+
+        :param rejected: Text of the token rejected by the server. If another caller has already replaced it, the current token is returned without fetching.
+        :return: A fresh token.
+        """
+        with self._lock:
+            if self._token is None or rejected is None or str(self._token) == rejected:
+                self._token = self._fetch(rejected)
+            return self._token
+
+
+def _token_identity(token: str) -> str:
+    """
+    Hashes the issuer and subject of an external JWT, or the whole token if it has no subject.
+    :param token: External token
+    :return: Identity hash
+    """
+    claims = decode_jwt_claims(token)
+    identity = f"{claims.get('iss')}\n{claims['sub']}" if claims.get("sub") else token
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+def _rejected_token(response: Response) -> str:
+    return response.request.headers.get("Authorization", "").removeprefix("Bearer ")
 
 
 class BoxerAuth(AuthBase):
     """Attaches HTTP Bearer Authentication to the given Request object sent to Boxer"""
 
-    def __init__(self, *, private_key_base64: str, consumer_id: str):
+    def __init__(
+        self,
+        *,
+        private_key_base64: str,
+        consumer_id: str,
+        signature_cache_size: int = 128,
+    ):
+        """
+          Creates Boxer signature auth.
+
+        :param private_key_base64: Base64-encoded RSA private key.
+        :param consumer_id: Boxer consumer identifier.
+        :param signature_cache_size: Number of signatures to memoize for repeated payloads. PKCS#1 v1.5 signatures are deterministic, so a payload always has the same signature.
+        """
         # setup any auth-related data here
         self._sign_key = private_key_base64
         self._consumer_id = consumer_id
+        self._signer = None
+        self._sign_string = lru_cache(maxsize=signature_cache_size)(
+            self._compute_signature
+        )
 
-    def _sign_string(self, input_string: str) -> str:
+    def _get_signer(self):
+        """
+        Parses the private key on first use and keeps a ready signer.
+        pycryptodome is imported here, so only processes that sign requests pay for loading it.
+        """
+        if self._signer is None:
+            # pylint: disable=import-outside-toplevel
+            from Crypto.PublicKey import RSA
+            from Crypto.Signature.PKCS1_v1_5 import new as signature_factory
+
+            private_key_bytes = base64.b64decode(self._sign_key)
+            rsa_key = RSA.importKey(private_key_bytes, "")
+            self._signer = signature_factory(rsa_key)
+
+        return self._signer
+
+    def _compute_signature(self, input_string: str) -> str:
         """
           Signs input for Boxer
 
         :param input_string: input to generate signature for
         :return:
         """
+        from Crypto.Hash.SHA256 import (  # pylint: disable=import-outside-toplevel
+            new as sha256_get_instance,
+        )
+
         msg_bytes = input_string.encode("utf-8")
         digest = sha256_get_instance()
 
-        private_key_bytes = base64.b64decode(self._sign_key)
-        rsa_key = RSA.importKey(private_key_bytes, "")
-        signer = signature_factory(rsa_key)
-
         digest.update(msg_bytes)
-        signed = signer.sign(digest)
+        signed = self._get_signer().sign(digest)
         return base64.b64encode(signed).decode("utf-8")
 
     def __call__(self, request: PreparedRequest):
@@ -93,6 +199,15 @@ class ExternalAuthBase(AuthBase):
         """
         return self._authentication_provider
 
+    def caller_identity(self) -> str:
+        """
+        Identifies the caller authenticated by this method, so tokens of different callers are never shared
+        :return: Opaque identity string
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} must implement caller_identity to be used with a token store"
+        )
+
 
 class ExternalTokenAuth(ExternalAuthBase):
     """
@@ -114,6 +229,9 @@ class ExternalTokenAuth(ExternalAuthBase):
         r.headers["Authorization"] = f"Bearer {self._token}"
         return r
 
+    def caller_identity(self) -> str:
+        return _token_identity(self._token)
+
 
 class RefreshableExternalTokenAuth(ExternalAuthBase):
     """
@@ -124,7 +242,9 @@ class RefreshableExternalTokenAuth(ExternalAuthBase):
     def __init__(self, get_token: Callable[[], str], authentication_provider: str):
         super().__init__(authentication_provider)
         self._get_token = get_token
-        self._retrying = False
+        # only refreshes after a rejection go through the shared token, the provider handles caching and expiry otherwise
+        self._refreshed_token = _SingleFlightToken(lambda _: get_token())
+        self._retry_state = threading.local()
 
     def __call__(self, r: PreparedRequest) -> PreparedRequest:
         """
@@ -133,25 +253,34 @@ class RefreshableExternalTokenAuth(ExternalAuthBase):
         :param r: Request to authorize
         :return: Request with Auth header set
         """
-        r.headers["Authorization"] = f"Bearer {self._get_token()}"
+        token = self._get_token()
+        self._refreshed_token.observe(token)
+        r.headers["Authorization"] = f"Bearer {token}"
         return r
 
+    def caller_identity(self) -> str:
+        return _token_identity(self._get_token())
+
     def refresh_token(self, response: Response, session: Session, *_, **__):
         """
         Refresh token hook if request fails with unauthorized or forbidden status code and retries the request.
+        Concurrent refreshes of the same token are collapsed into a single external token request.
         :param response:  Response received from API server
         :param session: Session used for original API interaction
         :param _: Positional arguments
         :param __: Keyword arguments
         :return:
         """
-        if self._retrying:
+        if getattr(self._retry_state, "retrying", False):
             return response
         if response.status_code == requests.codes["unauthorized"]:
-            self._retrying = True
-            response = session.send(self(response.request))
-            self._retrying = False
-            return response
+            token = self._refreshed_token.refresh(_rejected_token(response))
+            response.request.headers["Authorization"] = f"Bearer {token}"
+            self._retry_state.retrying = True
+            try:
+                return session.send(response.request)
+            finally:
+                self._retry_state.retrying = False
         return response
 
     def get_refresh_hook(
@@ -170,9 +299,37 @@ class BoxerTokenAuth(AuthBase):
     Implements Boxer auth token retrieving and renewing
     """
 
-    def __init__(self, token_provider: BoxerTokenProvider):
+    def __init__(
+        self,
+        token_provider: BoxerTokenProvider,
+        refresh_margin: float = 60,
+        background_refresh: bool = False,
+        clock: Callable[[], float] = time.time,
+        token_store: Optional[BoxerTokenStore] = None,
+    ):
+        """
+          Creates Boxer token auth.
+
+        :param token_provider: Provider used to obtain Boxer tokens.
+        :param refresh_margin: Time in seconds before token expiration when the token is refreshed.
+        :param background_refresh: If set to True, the token is refreshed ahead of expiration by a background thread, so requests never wait for a refresh.
+        :param clock: Function returning current UNIX timestamp.
+        :param token_store: Optional store to share tokens with other processes. It is checked before requesting a new token from the provider.
+        """
         self._token_provider = token_provider
-        self._token = None
+        self._token_store = token_store
+        self._token = _SingleFlightToken(self._fetch_token)
+        self._retry_state = threading.local()
+        self._refresh_margin = refresh_margin
+        self._clock = clock
+        self._obtained_at = clock()
+        self._stop_refresh = threading.Event()
+        self._refresh_thread = None
+        if background_refresh:
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_ahead, name="boxer-token-refresh", daemon=True
+            )
+            self._refresh_thread.start()
 
     def __call__(self, request: PreparedRequest) -> PreparedRequest:
         """
@@ -193,9 +350,15 @@ class BoxerTokenAuth(AuthBase):
         :param __: Keyword arguments
         :return:
         """
+        if getattr(self._retry_state, "retrying", False):
+            return response
         if response.status_code == requests.codes["unauthorized"]:
-            self._get_token(refresh=True)
-            return session.send(self(response.request))
+            self._get_token(refresh=True, rejected_token=_rejected_token(response))
+            self._retry_state.retrying = True
+            try:
+                return session.send(self(response.request))
+            finally:
+                self._retry_state.retrying = False
         return response
 
     def get_refresh_hook(
@@ -208,12 +371,99 @@ class BoxerTokenAuth(AuthBase):
         """
         return partial(self.refresh_token, session=session)
 
-    def _get_token(self, refresh=False) -> BoxerToken:
+    def _effective_refresh_margin(self, token: BoxerToken, obtained_at: float) -> float:
+        """
+          Returns the refresh margin for a token, capped at half of its lifetime.
+          A margin at or above the lifetime would replace the token on every request.
+
+        :param token: Boxer token.
+        :param obtained_at: Time the token was obtained, used as its issue time if the token does not carry one.
+        """
+        if token.expires_at is None:
+            return self._refresh_margin
+
+        lifetime = token.expires_at - (token.issued_at or obtained_at)
+        return max(min(self._refresh_margin, lifetime / 2), 0)
+
+    def _is_expiring(
+        self, token: BoxerToken, obtained_at: Optional[float] = None
+    ) -> bool:
+        return token.expires_within(
+            self._effective_refresh_margin(
+                token, self._obtained_at if obtained_at is None else obtained_at
+            ),
+            now=self._clock(),
+        )
+
+    def _fetch_token(self, rejected_token: Optional[str]) -> BoxerToken:
+        """
+        Obtains a new token from the shared token store, if configured, or from the token provider.
+        :param rejected_token: Token rejected by the server, which must not be served from the store.
+        :return: token for Boxer API
+        """
+        if self._token_store is None:
+            token = self._token_provider.get_token()
+        else:
+            token = self._token_store.get_or_fetch(
+                self._token_provider.token_cache_key(),
+                self._token_provider.get_token,
+                lambda stored: (
+                    (rejected_token is not None and str(stored) == rejected_token)
+                    or self._is_expiring(stored, obtained_at=self._clock())
+                ),
+            )
+
+        self._obtained_at = self._clock()
+        return token
+
+    def _get_token(
+        self, refresh=False, rejected_token: Optional[str] = None
+    ) -> BoxerToken:
         """
-        Retrieves token and stores it for future use
+        Retrieves token and stores it for future use. Safe to call from multiple threads: only one of them fetches a new token.
         :param refresh: True if we need to refresh token
+        :param rejected_token: Token rejected by the server. Refresh is skipped if it has already been replaced by another thread.
         :return: token for Boxer API
         """
-        if not self._token or refresh:
-            self._token = self._token_provider.get_token()
-        return self._token
+        if refresh:
+            return self._token.refresh(rejected_token)
+
+        return self._token.get(self._is_expiring)
+
+    def _refresh_ahead(self, retry_interval: float = 5) -> None:
+        """
+          Background refresh loop: renews the token refresh_margin seconds before it expires.
+
+        :param retry_interval: Time to wait before retrying a failed refresh.
+        """
+        wait_time = 0
+        while not self._stop_refresh.wait(wait_time):
+            try:
+                token = self._get_token()
+            except Exception as refresh_error:  # pylint: disable=broad-exception-caught
+                # any failure, e.g. of a token store, must not end the refresh loop
+                print(
+                    f"Failed to refresh Boxer token, retrying in {retry_interval} seconds: {refresh_error}"
+                )
+                wait_time = retry_interval
+                continue
+
+            if token.expires_at is None:
+                # token never expires, nothing to refresh ahead of time
+                return
+
+            wait_time = max(
+                token.expires_at
+                - self._effective_refresh_margin(token, self._obtained_at)
+                - self._clock(),
+                retry_interval,
+            )
+
+    def close(self) -> None:
+        """
+        Stops background token refresh, if it is running.
+        """
+        self._stop_refresh.set()
+        if self._refresh_thread:
+            self._refresh_thread.join()
+            self._refresh_thread = None
@@ -17,6 +17,7 @@ Interfaces for boxer API
 #
 
 from abc import ABC, abstractmethod
+from typing import Callable
 
 from esd_services_api_client.boxer._models import BoxerToken
 
@@ -31,3 +32,33 @@ class BoxerTokenProvider(ABC):
         :return: Boxer token
         :raises HTTPError
         """
+
+    def token_cache_key(self) -> str:
+        """
+        Key identifying tokens issued by this provider in a shared token store.
+        Must differ between providers that obtain tokens for different callers, e.g. include the consumer or external identity.
+        :return: Cache key
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} must implement token_cache_key to be used with a token store"
+        )
+
+
+class BoxerTokenStore(ABC):
+    """Token store interface, used to share Boxer tokens between processes"""
+
+    @abstractmethod
+    def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], BoxerToken],
+        is_stale: Callable[[BoxerToken], bool],
+    ) -> BoxerToken:
+        """
+        Returns a stored token, or fetches and stores a new one if there is none or the stored one is stale.
+        Concurrent callers with the same key must result in a single fetch.
+        :param key: Token key, see BoxerTokenProvider.token_cache_key
+        :param fetch: Function that obtains a new token
+        :param is_stale: Predicate that checks whether a stored token must be replaced
+        :return: Boxer token
+        """
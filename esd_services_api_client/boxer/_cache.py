@@ -0,0 +1,190 @@
+"""
+ Local cache for Boxer claims.
+"""
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from esd_services_api_client.boxer._models import Claim
+
+
+class ClaimCache:
+    """
+    TTL/LRU cache of parsed user claims, keyed by (provider, user_id), with an index from claim name to cached users.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int = 1024,
+        ttl: float = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+          Creates a claim cache.
+
+        :param max_size: Maximum number of users kept in the cache.
+        :param ttl: Time in seconds claims of a user are served from the cache.
+        :param clock: Monotonic clock returning time in seconds.
+        """
+        self._max_size = max_size
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[
+            Tuple[str, str], Tuple[float, tuple[Claim, ...]]
+        ] = OrderedDict()
+        self._claim_index: Dict[str, set[Tuple[str, str]]] = {}
+        # generation of the latest invalidation of each user, so reads that started before it are not cached
+        self._generation = 0
+        self._invalidations: OrderedDict[Tuple[str, str], int] = OrderedDict()
+        self._forgotten_generation = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def hits(self) -> int:
+        """
+        Number of lookups served from the cache.
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """
+        Number of lookups not found in the cache, or expired.
+        """
+        return self._misses
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        _, claims = self._entries.pop(key, (None, ()))
+        for claim in claims:
+            users = self._claim_index.get(claim.claim_name)
+            if users is not None:
+                users.discard(key)
+                if not users:
+                    del self._claim_index[claim.claim_name]
+
+    def _is_live(self, key: Tuple[str, str]) -> bool:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        if entry[0] <= self._clock():
+            self._drop(key)
+            return False
+        return True
+
+    def get(self, provider: str, user_id: str) -> Optional[tuple[Claim, ...]]:
+        """
+          Reads claims of a user from the cache.
+
+        :param provider: Identity provider.
+        :param user_id: User identifier.
+        :return: Cached claims, or None if the user is not cached or the entry expired
+        """
+        key = (provider, user_id)
+        with self._lock:
+            if not self._is_live(key):
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return self._entries[key][1]
+
+    def generation(self) -> int:
+        """
+          Returns the current invalidation generation. Read it before fetching claims and pass it to `put`.
+
+        :return: Generation number
+        """
+        with self._lock:
+            return self._generation
+
+    def put(
+        self,
+        provider: str,
+        user_id: str,
+        claims: list[Claim],
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+          Stores claims of a user.
+
+        :param provider: Identity provider.
+        :param user_id: User identifier.
+        :param claims: Claims of the user.
+        :param generation: Generation read before the claims were fetched. Claims are not stored if the user was invalidated since then.
+        """
+        key = (provider, user_id)
+        with self._lock:
+            if (
+                generation is not None
+                and self._invalidations.get(key, self._forgotten_generation)
+                > generation
+            ):
+                return
+
+            self._drop(key)
+            self._entries[key] = (self._clock() + self._ttl, tuple(claims))
+            for claim in claims:
+                self._claim_index.setdefault(claim.claim_name, set()).add(key)
+            while len(self._entries) > self._max_size:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, provider: str, user_id: str) -> None:
+        """
+          Removes claims of a user from the cache.
+
+        :param provider: Identity provider.
+        :param user_id: User identifier.
+        """
+        key = (provider, user_id)
+        with self._lock:
+            self._drop(key)
+            self._generation += 1
+            self._invalidations[key] = self._generation
+            self._invalidations.move_to_end(key)
+            # beyond max_size, only the latest forgotten generation is kept, which drops some unaffected puts
+            while len(self._invalidations) > self._max_size:
+                _, forgotten = self._invalidations.popitem(last=False)
+                self._forgotten_generation = forgotten
+
+    def users_with_claim(
+        self, claim_name: str, provider: Optional[str] = None
+    ) -> set[str]:
+        """
+          Finds cached users that have a claim. Only users present in the cache are considered.
+
+        :param claim_name: Name of the claim.
+        :param provider: Optional identity provider to filter users by.
+        :return: Identifiers of users that have the claim
+        """
+        with self._lock:
+            return {
+                user_id
+                for (user_provider, user_id) in list(
+                    self._claim_index.get(claim_name, ())
+                )
+                if (provider is None or user_provider == provider)
+                and self._is_live((user_provider, user_id))
+            }
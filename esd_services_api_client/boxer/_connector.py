@@ -17,18 +17,23 @@
 #
 
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import reduce
-from typing import Optional, Iterator, final
-
-try:
-    from adapta.security.clients import AzureClient
-except ImportError:
-    pass
+from typing import Optional, Iterator, Iterable, Dict, Tuple, Mapping, final
 
+from adapta.metrics import MetricsProvider
 from adapta.utils import session_with_retries
 from requests import Session, Response
 
 from esd_services_api_client.boxer._base import BoxerTokenProvider
+from esd_services_api_client.common._metrics import (
+    attach_metrics,
+    default_metrics_provider,
+    instrumented,
+)
+from esd_services_api_client.boxer._cache import ClaimCache
 from esd_services_api_client.boxer._auth import (
     BoxerAuth,
     ExternalTokenAuth,
@@ -41,6 +46,10 @@ from esd_services_api_client.boxer._models import (
     Claim,
     ClaimPayload,
     ClaimResponse,
+    ClaimChange,
+    ClaimChangeResult,
+    ClaimSyncPlan,
+    ClaimSyncReport,
 )
 
 
@@ -50,40 +59,112 @@ class BoxerClaimConnector:
     Boxer Claims API connector
     """
 
-    def __init__(self, *, base_url: str, auth: Optional[BoxerTokenAuth] = None):
+    def __init__(
+        self,
+        *,
+        base_url: str,
+        auth: Optional[BoxerTokenAuth] = None,
+        optimistic: bool = False,
+        user_existence_ttl: float = 0,
+        claim_cache: Optional[ClaimCache] = None,
+        session: Optional[Session] = None,
+        metrics_provider: Optional[MetricsProvider] = None,
+    ):
         """Creates Boxer Claims connector, capable of managing claims
         :param base_url: Base URL for Boxer Claims endpoint
         :param auth: Boxer-based authentication
+        :param optimistic: If set to True, claim changes are sent without checking that the user exists first. A missing user still results in None.
+        :param user_existence_ttl: Time in seconds to remember that a user exists, to skip repeated checks. Disabled by default.
+        :param claim_cache: Optional read-through cache for get_claims. Claim changes made through this connector invalidate it.
+        :param session: Optional HTTP session, e.g. one attached to a RequestRateLimiter. Defaults to a session with retries.
+        :param metrics_provider: Receives call latency and response metrics. Defaults to the process-wide provider.
         """
         self._base_url = base_url
-        self._http = session_with_retries()
+        self._http = session or session_with_retries()
         if auth and isinstance(auth, BoxerTokenAuth):
             self._http.hooks["response"].append(auth.get_refresh_hook(self._http))
         self._http.auth = auth
+        self.metrics = metrics_provider or default_metrics_provider()
+        attach_metrics(self._http, lambda: self.metrics)
+        self._optimistic = optimistic
+        self._user_existence_ttl = user_existence_ttl
+        self._known_users: Dict[Tuple[str, str], float] = {}
+        self._known_users_lock = threading.Lock()
+        self._claim_cache = claim_cache
+
+    @property
+    def claim_cache(self) -> Optional[ClaimCache]:
+        """
+        Returns the claim cache used by this connector, if any
+        """
+        return self._claim_cache
+
+    def _remember_user(self, user_id: str, provider: str, exists: bool) -> None:
+        if self._user_existence_ttl <= 0:
+            return
+        with self._known_users_lock:
+            if exists:
+                self._known_users[(provider, user_id)] = (
+                    time.monotonic() + self._user_existence_ttl
+                )
+            else:
+                self._known_users.pop((provider, user_id), None)
+
+    def _user_exists(self, user_id: str, provider: str) -> bool:
+        with self._known_users_lock:
+            if self._known_users.get((provider, user_id), 0) > time.monotonic():
+                return True
 
+        exists = self.get_claims(user_id, provider) is not None
+        self._remember_user(user_id, provider, exists)
+        return exists
+
+    @instrumented("boxer.get_claims")
     def get_claims(self, user_id: str, provider: str) -> Optional[Iterator[Claim]]:
         """
         Returns the claims assigned to the specified user_id and provider
         """
+        if (
+            self._claim_cache is not None
+            and (cached_claims := self._claim_cache.get(provider, user_id)) is not None
+        ):
+            return iter(cached_claims)
+
+        generation = (
+            self._claim_cache.generation() if self._claim_cache is not None else None
+        )
         response = self._http.get(f"{self._base_url}/claim/{provider}/{user_id}")
         if response.status_code == 404:
             return None
         response.raise_for_status()
-        return self._iterate_user_claims_response(response)
+        if self._claim_cache is None:
+            return self._iterate_user_claims_response(response)
+
+        user_claims = list(self._iterate_user_claims_response(response))
+        self._claim_cache.put(provider, user_id, user_claims, generation)
+        return iter(user_claims)
 
+    @instrumented("boxer.add_user")
     def add_user(self, user_id: str, provider: str) -> ClaimResponse:
         """
         Adds a new user_id, provider pair
         """
         response = self._http.post(f"{self._base_url}/claim/{provider}/{user_id}")
         response.raise_for_status()
+        self._remember_user(user_id, provider, True)
+        if self._claim_cache is not None:
+            self._claim_cache.invalidate(provider, user_id)
         return ClaimResponse.from_dict(response.json())
 
+    @instrumented("boxer.remove_user")
     def remove_user(self, user_id: str, provider: str) -> Response:
         """
         Removes the specified user_id, provider pair and assigned claims
         """
         response = self._http.delete(f"{self._base_url}/claim/{provider}/{user_id}")
+        self._remember_user(user_id, provider, False)
+        if self._claim_cache is not None:
+            self._claim_cache.invalidate(provider, user_id)
         response.raise_for_status()
         return response
 
@@ -91,45 +172,179 @@ class BoxerClaimConnector:
         self, user_id: str, provider: str, claims: list[Claim]
     ) -> Optional[ClaimResponse]:
         """
-        Adds a new claim to an existing user_id, provider pair
+        Adds a new claim to an existing user_id, provider pair. Returns None if the user does not exist.
         """
-        payload_json = self._prepare_claim_payload(user_id, provider, claims, "Insert")
-        response = self._http.patch(
-            f"{self._base_url}/claim/{provider}/{user_id}",
-            data=payload_json,
-            headers={"Content-Type": "application/json"},
-        )
-        response.raise_for_status()
-        return ClaimResponse.from_dict(response.json())
+        return self._patch_claims(user_id, provider, claims, "Insert")
 
     def remove_claim(
         self, user_id: str, provider: str, claims: list[Claim]
     ) -> Optional[ClaimResponse]:
         """
-        Removes the specified claim
+        Removes the specified claim. Returns None if the user does not exist.
         """
-        payload_json = self._prepare_claim_payload(user_id, provider, claims, "Delete")
+        return self._patch_claims(user_id, provider, claims, "Delete")
+
+    @instrumented("boxer.patch_claims")
+    def _patch_claims(
+        self,
+        user_id: str,
+        provider: str,
+        claims: list[Claim],
+        operation: str,
+        check_user: bool = True,
+    ) -> Optional[ClaimResponse]:
+        """
+        Sends Insert/Delete claims request for a user
+        """
+        if (
+            check_user
+            and not self._optimistic
+            and not self._user_exists(user_id, provider)
+        ):
+            return None
+
         response = self._http.patch(
             f"{self._base_url}/claim/{provider}/{user_id}",
-            data=payload_json,
+            data=self._prepare_claim_payload(claims, operation),
             headers={"Content-Type": "application/json"},
         )
+        if self._claim_cache is not None:
+            self._claim_cache.invalidate(provider, user_id)
+        if response.status_code == 404:
+            self._remember_user(user_id, provider, False)
+            return None
+        response.raise_for_status()
         return ClaimResponse.from_dict(response.json())
 
-    def _prepare_claim_payload(
-        self, user_id: str, provider: str, claims: list[Claim], operation: str
-    ) -> Optional[str]:
+    def _apply_claim_change(
+        self, change: ClaimChange, check_user: bool = True
+    ) -> ClaimChangeResult:
+        try:
+            if change.operation not in ("Insert", "Delete"):
+                raise ValueError(
+                    f"Unsupported claim operation {change.operation}, expected one of ['Insert', 'Delete']"
+                )
+            return ClaimChangeResult(
+                change=change,
+                response=self._patch_claims(
+                    change.user_id,
+                    change.provider,
+                    change.claims,
+                    change.operation,
+                    check_user=check_user,
+                ),
+            )
+        except Exception as change_error:  # pylint: disable=broad-exception-caught
+            return ClaimChangeResult(change=change, error=change_error)
+
+    def apply_claims(
+        self, changes: Iterable[ClaimChange], max_workers: int = 8
+    ) -> list[ClaimChangeResult]:
         """
-        Prepare payload for Inserting/Deleting claims
+        Applies claim changes for many users concurrently. Failed changes do not stop the remaining ones.
+        :param changes: Claim changes as ClaimChange or (user_id, provider, operation, claims) tuples, where operation is Insert or Delete.
+        :param max_workers: Maximum number of changes applied at the same time.
+        :return: Results in the same order as changes, each holding a ClaimResponse or an error.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as change_pool:
+            return list(
+                change_pool.map(
+                    self._apply_claim_change,
+                    (ClaimChange(*change) for change in changes),
+                )
+            )
+
+    @staticmethod
+    def _claims_by_key(claims: Iterable[Claim]) -> Dict[Tuple[str, str], Claim]:
+        return {(claim.claim_name, claim.claim_value): claim for claim in claims}
+
+    def _plan_claims(
+        self, user_id: str, provider: str, desired_claims: Iterable[Claim]
+    ) -> Optional[ClaimSyncPlan]:
+        current_claims = self.get_claims(user_id, provider)
+        if current_claims is None:
+            return None
+
+        # Claim is mutable, so claims are compared by (name, value) instead of being hashed
+        current = self._claims_by_key(current_claims)
+        desired = self._claims_by_key(desired_claims)
+        return ClaimSyncPlan(
+            user_id=user_id,
+            provider=provider,
+            inserts=[desired[key] for key in sorted(desired.keys() - current.keys())],
+            deletes=[current[key] for key in sorted(current.keys() - desired.keys())],
+        )
+
+    def _apply_claim_plan(self, plan: ClaimSyncPlan) -> list[ClaimChangeResult]:
+        return [
+            self._apply_claim_change(change, check_user=False)
+            for change in plan.changes()
+        ]
+
+    def sync_claims(
+        self,
+        desired: Mapping[str, Iterable[Claim]],
+        provider: str,
+        dry_run: bool = False,
+        max_workers: int = 8,
+    ) -> ClaimSyncReport:
         """
-        if self.get_claims(user_id, provider) is not None:
-            payload = ClaimPayload(operation, {})
-            claim_payload = reduce(
-                lambda cp, claim: cp.add_claim(claim), claims, payload
+        Brings claims of the given users to the desired state with the minimal number of requests.
+        Current claims are read concurrently, and only users whose claims differ receive Delete/Insert changes.
+        Users that do not exist in Boxer are reported and skipped.
+        :param desired: Complete claims each user should have.
+        :param provider: Identity provider of the users.
+        :param dry_run: If set to True, changes are planned, but not applied.
+        :param max_workers: Maximum number of users processed at the same time.
+        :return: A report with planned changes, results of applied changes and timings.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as sync_pool:
+            fetch_start = time.monotonic()
+            user_plans = list(
+                sync_pool.map(
+                    lambda user_claims: self._plan_claims(
+                        user_claims[0], provider, user_claims[1]
+                    ),
+                    desired.items(),
+                )
+            )
+            fetch_seconds = time.monotonic() - fetch_start
+
+            plans = [plan for plan in user_plans if plan and not plan.is_empty]
+            apply_start = time.monotonic()
+            results = (
+                []
+                if dry_run
+                else [
+                    result
+                    for plan_results in sync_pool.map(self._apply_claim_plan, plans)
+                    for result in plan_results
+                ]
             )
+            apply_seconds = time.monotonic() - apply_start
 
-            return claim_payload.to_json()
-        return None
+        return ClaimSyncReport(
+            plans=plans,
+            results=results,
+            missing_users=[
+                user_id
+                for user_id, plan in zip(desired.keys(), user_plans)
+                if plan is None
+            ],
+            dry_run=dry_run,
+            fetch_seconds=fetch_seconds,
+            apply_seconds=apply_seconds,
+        )
+
+    @staticmethod
+    def _prepare_claim_payload(claims: list[Claim], operation: str) -> str:
+        """
+        Prepare payload for Inserting/Deleting claims
+        """
+        payload = ClaimPayload(operation, {})
+        claim_payload = reduce(lambda cp, claim: cp.add_claim(claim), claims, payload)
+
+        return claim_payload.to_json()
 
     def _iterate_user_claims_response(
         self, user_claim_response: Response
@@ -160,10 +375,12 @@ class BoxerConnector(BoxerTokenProvider):
         auth: ExternalAuthBase,
         retry_attempts=10,
         session: Optional[Session] = None,
+        metrics_provider: Optional[MetricsProvider] = None,
     ):
         """Creates Boxer Auth connector, capable of managing claims/consumers
         :param base_url: Base URL for Boxer Auth endpoint
         :param retry_attempts: Number of retries for Boxer-specific error messages
+        :param metrics_provider: Receives call latency and response metrics. Defaults to the process-wide provider.
         """
         self.base_url = base_url
         self.http = session or session_with_retries()
@@ -173,7 +390,10 @@ class BoxerConnector(BoxerTokenProvider):
         if isinstance(auth, RefreshableExternalTokenAuth):
             self.http.hooks["response"].append(auth.get_refresh_hook(self.http))
         self.retry_attempts = retry_attempts
+        self.metrics = metrics_provider or default_metrics_provider()
+        attach_metrics(self.http, lambda: self.metrics)
 
+    @instrumented("boxer.get_token")
     def get_token(self) -> BoxerToken:
         """
         Authorize with external token and return BoxerToken
@@ -188,6 +408,13 @@ class BoxerConnector(BoxerTokenProvider):
         response.raise_for_status()
         return BoxerToken(response.text)
 
+    def token_cache_key(self) -> str:
+        """
+        Tokens are shared between connectors using the same Boxer instance, identity provider and external identity
+        :return: Cache key
+        """
+        return f"{self.base_url}/token/{self.authentication_provider}/{self.http.auth.caller_identity()}"
+
     @staticmethod
     def _create_boxer_auth():
         assert os.environ.get(
@@ -211,6 +438,11 @@ def select_authentication(auth_provider: str, env: str) -> Optional[BoxerTokenAu
     :return: BoxerAuthentication or None
     """
     if auth_provider == "azuread":
+        # imported on use, as it loads the optional Azure SDK
+        from adapta.security.clients import (  # pylint: disable=import-outside-toplevel
+            AzureClient,
+        )
+
         proteus_client = AzureClient(subscription_id="")
         external_auth = RefreshableExternalTokenAuth(
             proteus_client.get_access_token, auth_provider
@@ -16,7 +16,12 @@
 #  limitations under the License.
 #
 
-from dataclasses import dataclass
+import base64
+import binascii
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Optional, NamedTuple
 
 from dataclasses_json import LetterCase, dataclass_json, DataClassJsonMixin
 
@@ -63,6 +68,118 @@ class ClaimResponse(DataClassJsonMixin):
     billing_id: str
 
 
+class ClaimChange(NamedTuple):
+    """
+    Claim modification for a single user, used in bulk claim operations
+    """
+
+    user_id: str
+    provider: str
+    operation: str
+    claims: list[Claim]
+
+
+@dataclass
+class ClaimChangeResult:
+    """
+    Outcome of a single claim modification in a bulk claim operation
+    """
+
+    change: ClaimChange
+    response: Optional[ClaimResponse] = None
+    error: Optional[Exception] = None
+
+    @property
+    def user_missing(self) -> bool:
+        """
+        True if the change was not applied because the user does not exist
+        """
+        return self.error is None and self.response is None
+
+    @property
+    def succeeded(self) -> bool:
+        """
+        True if the change was applied without errors
+        """
+        return self.error is None and self.response is not None
+
+
+@dataclass
+class ClaimSyncPlan:
+    """
+    Minimal set of claim changes that brings a user to the desired state
+    """
+
+    user_id: str
+    provider: str
+    inserts: list[Claim] = field(default_factory=list)
+    deletes: list[Claim] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        """
+        True if the user already has the desired claims
+        """
+        return not self.inserts and not self.deletes
+
+    def changes(self) -> list[ClaimChange]:
+        """
+        Claim changes for this plan, deletes first
+        """
+        return [
+            ClaimChange(
+                self.user_id,
+                self.provider,
+                operation,
+                claims,
+            )
+            for operation, claims in [
+                ("Delete", self.deletes),
+                ("Insert", self.inserts),
+            ]
+            if claims
+        ]
+
+
+@dataclass
+class ClaimSyncReport:
+    """
+    Outcome of a claims synchronization
+    """
+
+    plans: list[ClaimSyncPlan]
+    results: list[ClaimChangeResult]
+    missing_users: list[str]
+    dry_run: bool
+    fetch_seconds: float
+    apply_seconds: float
+
+    @property
+    def failed(self) -> list[ClaimChangeResult]:
+        """
+        Changes that could not be applied
+        """
+        return [result for result in self.results if not result.succeeded]
+
+
+def decode_jwt_claims(token: str) -> dict:
+    """
+      Reads the payload of a JWT without validating its signature.
+
+    :param token: Token text.
+    :return: Token claims, or an empty dict if the token is not a JWT
+    """
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+    except (IndexError, ValueError, binascii.Error):
+        return {}
+
+    return claims if isinstance(claims, dict) else {}
+
+
 class BoxerToken:
     """
     Represents token created by BoxerConnector.get_token
@@ -70,6 +187,48 @@ class BoxerToken:
 
     def __init__(self, token: str):
         self._token = token
+        self._expires_at = self._decode_timestamp(token, "exp")
+        self._issued_at = self._decode_timestamp(token, "iat")
+
+    @staticmethod
+    def _decode_timestamp(token: str, claim: str) -> Optional[float]:
+        """
+          Reads a timestamp claim from a JWT payload. Signature is not validated, since the token is only forwarded to Boxer-protected services.
+
+        :param token: Token text.
+        :param claim: Claim name, e.g. `exp`.
+        :return: Claim value as a UNIX timestamp, or None if the token is not a JWT or has no such claim.
+        """
+        try:
+            return float(decode_jwt_claims(token)[claim])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        """
+        Expiration time of this token as a UNIX timestamp, if known
+        """
+        return self._expires_at
+
+    @property
+    def issued_at(self) -> Optional[float]:
+        """
+        Issue time of this token as a UNIX timestamp, if known
+        """
+        return self._issued_at
+
+    def expires_within(self, seconds: float, now: Optional[float] = None) -> bool:
+        """
+          Checks whether the token expires within the given time. Tokens without a known expiration never expire.
+
+        :param seconds: Time window in seconds.
+        :param now: Current UNIX timestamp. Defaults to time.time().
+        """
+        if self._expires_at is None:
+            return False
+
+        return self._expires_at - (now if now is not None else time.time()) <= seconds
 
     def __str__(self):
         return self._token
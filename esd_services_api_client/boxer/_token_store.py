@@ -0,0 +1,131 @@
+"""
+ Token stores for sharing Boxer tokens between processes.
+"""
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import hashlib
+import os
+import stat
+import tempfile
+from typing import Callable, Optional, final
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from esd_services_api_client.boxer._base import BoxerTokenStore
+from esd_services_api_client.boxer._models import BoxerToken
+
+
+@final
+class FileTokenStore(BoxerTokenStore):
+    """
+    Stores Boxer tokens in a local directory, so all processes on a host (e.g. gunicorn or Celery workers) share them.
+    Access is serialized with an exclusive file lock, so only one process fetches a new token. Requires a POSIX system.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+          Creates a file token store.
+
+        :param directory: Directory for token files. Defaults to a user-private folder in the system temp directory.
+          Must be owned by the current user and not accessible to other users.
+        """
+        if fcntl is None:
+            raise OSError("FileTokenStore requires a POSIX system with fcntl")
+
+        self._directory = directory or os.path.join(
+            tempfile.gettempdir(), f"esd-boxer-tokens-{os.getuid()}"
+        )
+        os.makedirs(self._directory, mode=0o700, exist_ok=True)
+        self._check_directory()
+
+    def _check_directory(self) -> None:
+        # the directory may have been created by another user, who could then read or plant tokens
+        directory_stat = os.lstat(self._directory)
+        if not stat.S_ISDIR(directory_stat.st_mode):
+            raise PermissionError(f"Token store {self._directory} is not a directory")
+        if directory_stat.st_uid != os.getuid():
+            raise PermissionError(
+                f"Token store {self._directory} is not owned by the current user"
+            )
+        if stat.S_IMODE(directory_stat.st_mode) != 0o700:
+            raise PermissionError(
+                f"Token store {self._directory} must have mode 0o700, found {oct(stat.S_IMODE(directory_stat.st_mode))}"
+            )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(
+            self._directory, hashlib.sha256(key.encode("utf-8")).hexdigest()
+        )
+
+    def _read(self, token_path: str) -> Optional[BoxerToken]:
+        try:
+            with open(token_path, "r", encoding="utf-8") as token_file:
+                token = token_file.read()
+        except FileNotFoundError:
+            return None
+
+        return BoxerToken(token) if token else None
+
+    def _write(self, token_path: str, token: BoxerToken) -> None:
+        temp_path = f"{token_path}.{os.getpid()}.tmp"
+        with open(
+            os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600),
+            "w",
+            encoding="utf-8",
+        ) as token_file:
+            token_file.write(str(token))
+        os.replace(temp_path, token_path)
+
+    def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], BoxerToken],
+        is_stale: Callable[[BoxerToken], bool],
+    ) -> BoxerToken:
+        token_path = self._path(key)
+        token = self._read(token_path)
+        if token is not None and not is_stale(token):
+            return token
+
+        with open(
+            os.open(f"{token_path}.lock", os.O_RDWR | os.O_CREAT, 0o600),
+            "r+",
+            encoding="utf-8",
+        ) as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # another process may have refreshed the token while we waited for the lock
+                token = self._read(token_path)
+                if token is None or is_stale(token):
+                    token = fetch()
+                    self._write(token_path, token)
+                return token
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def invalidate(self, key: str) -> None:
+        """
+          Removes a stored token.
+
+        :param key: Token key.
+        """
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
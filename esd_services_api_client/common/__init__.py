@@ -1,3 +1,7 @@
+"""
+ Import index. Names are loaded from submodules on first access, so importing the package stays cheap.
+"""
+
 #  Copyright (c) 2023-2024. ECCO Sneaks & Data
 #
 #  Licensed under the Apache License, Version 2.0 (the "License");
@@ -12,3 +16,36 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 #
+
+from typing import TYPE_CHECKING
+
+from esd_services_api_client._lazy import lazy_exports
+
+_EXPORTS = {
+    "RateBudget": "_rate_limiter",
+    "EndpointStats": "_rate_limiter",
+    "TokenBucket": "_rate_limiter",
+    "RequestRateLimiter": "_rate_limiter",
+    "retry_after_seconds": "_rate_limiter",
+    "HistogramSummary": "_metrics",
+    "InMemoryMetricsProvider": "_metrics",
+    "default_metrics_provider": "_metrics",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from esd_services_api_client.common._rate_limiter import (
+        RateBudget,
+        EndpointStats,
+        TokenBucket,
+        RequestRateLimiter,
+        retry_after_seconds,
+    )
+    from esd_services_api_client.common._metrics import (
+        HistogramSummary,
+        InMemoryMetricsProvider,
+        default_metrics_provider,
+    )
@@ -0,0 +1,299 @@
+"""
+  Latency and response metrics for connector calls.
+"""
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import contextlib
+import functools
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, Optional, Tuple, Deque
+
+from requests import Response, Session
+from adapta.metrics import MetricsProvider
+
+METRIC_NAMESPACE = "esd_services_api_client"
+CALL_DURATION = "call.duration"
+CALL_RETRIES = "call.retries"
+HTTP_DURATION = "http.duration"
+HTTP_RESPONSE_SIZE = "http.response_size"
+HTTP_RESPONSES = "http.responses"
+
+_TagKey = Tuple[Tuple[str, str], ...]
+
+
+def _tag_key(tags: Optional[dict[str, str]]) -> _TagKey:
+    return tuple(sorted((tags or {}).items()))
+
+
+@dataclass
+class HistogramSummary:
+    """
+    Aggregated values of a histogram metric. Percentiles are computed over the most recent samples.
+    """
+
+    count: int = 0
+    total: float = 0
+    min: float = float("inf")
+    max: float = float("-inf")
+    samples: Deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+
+    def add(self, value: float) -> None:
+        """
+          Adds a value to the summary.
+
+        :param value: Observed value.
+        """
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.samples.append(value)
+
+    def percentile(self, percent: float) -> float:
+        """
+          Returns a percentile of recent values.
+
+        :param percent: Percentile between 0 and 100.
+        :return: Value at the percentile, or 0 if nothing was recorded
+        """
+        if not self.samples:
+            return 0
+        ordered = sorted(self.samples)
+        return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+
+class InMemoryMetricsProvider(MetricsProvider):
+    """
+    Metrics provider that keeps counters and histograms in memory, for inspection in tests, notebooks or at the end of a DAG task.
+    """
+
+    def __init__(self):
+        self._counters: Dict[Tuple[str, _TagKey], float] = {}
+        self._gauges: Dict[Tuple[str, _TagKey], float] = {}
+        self._histograms: Dict[Tuple[str, _TagKey], HistogramSummary] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, metric_name: str, tags: dict[str, str] | None = None) -> None:
+        self.count(metric_name, 1, tags)
+
+    def decrement(self, metric_name: str, tags: dict[str, str] | None = None) -> None:
+        self.count(metric_name, -1, tags)
+
+    def count(
+        self, metric_name: str, metric_value: int, tags: dict[str, str] | None = None
+    ) -> None:
+        key = (metric_name, _tag_key(tags))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + metric_value
+
+    def gauge(
+        self, metric_name: str, metric_value: float, tags: dict[str, str] | None = None
+    ) -> None:
+        with self._lock:
+            self._gauges[(metric_name, _tag_key(tags))] = metric_value
+
+    def set(
+        self, metric_name: str, metric_value: float, tags: dict[str, str] | None = None
+    ) -> None:
+        self.gauge(metric_name, metric_value, tags)
+
+    def histogram(
+        self, metric_name: str, metric_value: float, tags: dict[str, str] | None = None
+    ) -> None:
+        key = (metric_name, _tag_key(tags))
+        with self._lock:
+            self._histograms.setdefault(key, HistogramSummary()).add(metric_value)
+
+    def distribution(
+        self, metric_name: str, metric_value: float, tags: dict[str, str] | None = None
+    ) -> None:
+        self.histogram(metric_name, metric_value, tags)
+
+    def counter(self, metric_name: str, tags: dict[str, str] | None = None) -> float:
+        """
+          Returns the value of a counter.
+
+        :param metric_name: Name of the counter.
+        :param tags: Exact tags the counter was recorded with.
+        :return: Counter value, or 0 if never recorded
+        """
+        with self._lock:
+            return self._counters.get((metric_name, _tag_key(tags)), 0)
+
+    def summaries(self, metric_name: str) -> Dict[_TagKey, HistogramSummary]:
+        """
+          Returns summaries of a histogram for every recorded tag combination.
+
+        :param metric_name: Name of the histogram.
+        :return: Summaries keyed by sorted (tag, value) pairs
+        """
+        with self._lock:
+            return {
+                tags: summary
+                for (name, tags), summary in self._histograms.items()
+                if name == metric_name
+            }
+
+    def report(self) -> list[dict]:
+        """
+          Summarizes call durations, slowest total time first, to show which calls dominate wall time.
+
+        :return: One row per operation and outcome, with count, total, p50, p95 and max duration in seconds
+        """
+        return sorted(
+            (
+                dict(tags)
+                | {
+                    "count": summary.count,
+                    "total": summary.total,
+                    "p50": summary.percentile(50),
+                    "p95": summary.percentile(95),
+                    "max": summary.max,
+                }
+                for tags, summary in self.summaries(CALL_DURATION).items()
+            ),
+            key=lambda row: row["total"],
+            reverse=True,
+        )
+
+
+@functools.lru_cache(maxsize=1)
+def default_metrics_provider() -> MetricsProvider:
+    """
+      Returns the process-wide metrics provider used by connectors, unless another one is configured.
+      Metrics are sent to Datadog if adapta's datadog extra is installed and an agent is configured (DD_AGENT_HOST or DD_DOGSTATSD_URL),
+      otherwise they are kept in an InMemoryMetricsProvider.
+
+    :return: A shared MetricsProvider
+    """
+    if "DD_AGENT_HOST" in os.environ or "DD_DOGSTATSD_URL" in os.environ:
+        try:
+            # imported on use, as the datadog client is slow to load
+            from adapta.metrics.providers.datadog_provider import (  # pylint: disable=import-outside-toplevel
+                DatadogMetricsProvider,
+            )
+
+            return DatadogMetricsProvider(metric_namespace=METRIC_NAMESPACE)
+        except ImportError:
+            pass
+
+    return InMemoryMetricsProvider()
+
+
+_call_context = threading.local()
+
+
+def current_operation() -> str:
+    """
+      Returns the name of the instrumented connector method running in the current thread.
+
+    :return: Operation name, or "unknown" outside of instrumented methods
+    """
+    operations = getattr(_call_context, "operations", None)
+    return operations[-1] if operations else "unknown"
+
+
+@contextlib.contextmanager
+def operation_context(operation: str) -> Iterator[None]:
+    """
+      Tags HTTP responses received in the current thread with an operation name, without recording call duration.
+      Use around requests of generators, which cannot be instrumented as a whole. Must not be held across a yield.
+
+    :param operation: Operation name, e.g. "beast.iter_logs".
+    """
+    operations = getattr(_call_context, "operations", None)
+    if operations is None:
+        operations = _call_context.operations = []
+    operations.append(operation)
+    try:
+        yield
+    finally:
+        operations.pop()
+
+
+def instrumented(operation: str) -> Callable:
+    """
+      Records duration and outcome of a connector method in the metrics provider of the connector (its `metrics` attribute).
+      HTTP responses received during the call are tagged with the operation name.
+
+    :param operation: Operation name used as the `operation` tag, e.g. "beast.submit".
+    :return: Method decorator
+    """
+
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            started_at = time.monotonic()
+            outcome = "error"
+            try:
+                with operation_context(operation):
+                    result = method(self, *args, **kwargs)
+                outcome = "success"
+                return result
+            finally:
+                self.metrics.histogram(
+                    CALL_DURATION,
+                    time.monotonic() - started_at,
+                    tags={"operation": operation, "outcome": outcome},
+                )
+
+        return wrapper
+
+    return decorator
+
+
+def record_backoff(details: dict) -> None:
+    """
+      Backoff handler that counts retries of connector methods. Use as on_backoff of backoff decorators.
+
+    :param details: Backoff invocation details.
+    """
+    connector = details["args"][0] if details.get("args") else None
+    metrics = getattr(connector, "metrics", None)
+    if metrics is not None:
+        metrics.increment(
+            CALL_RETRIES, tags={"operation": details["target"].__qualname__}
+        )
+
+
+def attach_metrics(session: Session, metrics: Callable[[], MetricsProvider]) -> None:
+    """
+      Records latency, status code and size of every response received by a session.
+
+    :param session: Session to instrument.
+    :param metrics: Returns the metrics provider to record into, so a connector can replace its provider after creation.
+    """
+
+    def record_response(response: Response, *_, **kwargs) -> None:
+        tags = {
+            "operation": current_operation(),
+            "status_code": str(response.status_code),
+        }
+        provider = metrics()
+        provider.increment(HTTP_RESPONSES, tags=tags)
+        provider.histogram(HTTP_DURATION, response.elapsed.total_seconds(), tags=tags)
+        # streamed bodies must stay unread, so only their declared length is recorded
+        size = response.headers.get("Content-Length")
+        if size is None and not kwargs.get("stream"):
+            size = len(response.content or b"")
+        if size is not None:
+            provider.histogram(HTTP_RESPONSE_SIZE, float(size), tags=tags)
+
+    session.hooks["response"].append(record_response)
@@ -0,0 +1,289 @@
+"""
+  Client-side rate limiting and concurrency control for HTTP sessions.
+"""
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+from requests import Response, Session, PreparedRequest
+from requests.adapters import BaseAdapter
+
+
+def retry_after_seconds(response: Response, default: float) -> float:
+    """
+      Reads the Retry-After header of a response, given either in seconds or as an HTTP date.
+
+    :param response: HTTP response.
+    :param default: Value returned if the header is missing or invalid.
+    :return: Time to wait in seconds
+    """
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is None:
+        return default
+    try:
+        return max(float(retry_after), 0)
+    except ValueError:
+        pass
+    try:
+        return max(
+            (
+                parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)
+            ).total_seconds(),
+            0,
+        )
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass(frozen=True)
+class RateBudget:
+    """
+    Request budget of an endpoint: sustained rate in requests per second, and the number of requests allowed in a burst
+    """
+
+    rate: float
+    burst: int = 1
+
+
+@dataclass
+class EndpointStats:
+    """
+    Queueing statistics of an endpoint
+    """
+
+    requests: int = 0
+    total_wait: float = 0
+    max_wait: float = 0
+    throttled: int = 0
+
+    @property
+    def mean_wait(self) -> float:
+        """
+        Average time in seconds a request waited before it was sent
+        """
+        return self.total_wait / self.requests if self.requests else 0
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out send times. Requests over budget wait for tokens to refill instead of failing.
+    """
+
+    def __init__(self, budget: RateBudget, clock: Callable[[], float] = time.monotonic):
+        """
+          Creates a full token bucket.
+
+        :param budget: Rate and burst size of the bucket.
+        :param clock: Monotonic clock returning time in seconds.
+        """
+        self._budget = budget
+        self._clock = clock
+        self._tokens = float(budget.burst)
+        self._updated_at = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+          Takes a token from the bucket, going into debt if the bucket is empty.
+
+        :return: Time in seconds to wait before sending the request
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                float(self._budget.burst),
+                self._tokens + (now - self._updated_at) * self._budget.rate,
+            )
+            self._updated_at = now
+            self._tokens -= 1
+            return max(-self._tokens / self._budget.rate, self._paused_until - now, 0)
+
+    def pause(self, seconds: float) -> None:
+        """
+          Stops handing out tokens for the given time, e.g. after the server asked to retry later.
+
+        :param seconds: Pause duration.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+class RequestRateLimiter:
+    """
+    Rate limiter and concurrency governor shared by connector sessions.
+    Requests wait for a token of their endpoint budget and for a free in-flight slot before they are sent.
+    Retry-After headers of throttled responses pause the endpoint for all sessions that share the limiter.
+    """
+
+    def __init__(
+        self,
+        *,
+        default_budget: Optional[RateBudget] = None,
+        endpoint_budgets: Optional[Dict[str, RateBudget]] = None,
+        max_in_flight: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+          Creates a rate limiter.
+
+        :param default_budget: Budget for requests that do not match any endpoint budget. Unlimited if not provided.
+        :param endpoint_budgets: Budgets keyed by URL path prefix, e.g. "/job/submit". The longest matching prefix is used.
+        :param max_in_flight: Maximum number of requests sent at the same time. Unlimited if not provided.
+        :param clock: Monotonic clock returning time in seconds.
+        :param sleep: Function that blocks for the given number of seconds.
+        """
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets: Dict[str, TokenBucket] = {
+            prefix: TokenBucket(budget, clock)
+            for prefix, budget in (endpoint_budgets or {}).items()
+        }
+        self._prefixes = sorted(self._buckets, key=len, reverse=True)
+        self._default_bucket = (
+            TokenBucket(default_budget, clock) if default_budget else None
+        )
+        self._in_flight = (
+            threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        )
+        self._stats: Dict[str, EndpointStats] = {}
+        self._stats_lock = threading.Lock()
+
+    def _endpoint(self, url: str) -> str:
+        path = urlsplit(url).path
+        return next(
+            (prefix for prefix in self._prefixes if path.startswith(prefix)), ""
+        )
+
+    def _bucket(self, endpoint: str) -> Optional[TokenBucket]:
+        return self._buckets.get(endpoint, self._default_bucket)
+
+    def _record(self, endpoint: str, wait: float = 0, throttled: bool = False) -> None:
+        with self._stats_lock:
+            stats = self._stats.setdefault(endpoint, EndpointStats())
+            if throttled:
+                stats.throttled += 1
+                return
+            stats.requests += 1
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[float]:
+        """
+          Waits until a request to the URL may be sent, and holds an in-flight slot while the context is active.
+
+        :param url: Request URL.
+        :return: Context manager yielding the time in seconds the request was queued
+        """
+        endpoint = self._endpoint(url)
+        queued_at = self._clock()
+        bucket = self._bucket(endpoint)
+        if bucket is not None and (wait := bucket.reserve()) > 0:
+            self._sleep(wait)
+        if self._in_flight is not None:
+            self._in_flight.acquire()
+        try:
+            queued = self._clock() - queued_at
+            self._record(endpoint, wait=queued)
+            yield queued
+        finally:
+            if self._in_flight is not None:
+                self._in_flight.release()
+
+    def observe(self, url: str, response: Response) -> None:
+        """
+          Pauses the endpoint of a throttled response (HTTP 429 or 503) for the time given in its Retry-After header.
+
+        :param url: Request URL.
+        :param response: Received response.
+        """
+        if response.status_code not in (429, 503):
+            return
+        endpoint = self._endpoint(url)
+        self._record(endpoint, throttled=True)
+        retry_after = retry_after_seconds(response, default=0)
+        bucket = self._bucket(endpoint)
+        if retry_after > 0 and bucket is not None:
+            bucket.pause(retry_after)
+
+    def stats(self) -> Dict[str, EndpointStats]:
+        """
+          Returns queueing statistics, keyed by endpoint prefix. Requests without an endpoint budget are reported under "".
+
+        :return: A copy of the current statistics
+        """
+        with self._stats_lock:
+            return {
+                endpoint: EndpointStats(**vars(stats))
+                for endpoint, stats in self._stats.items()
+            }
+
+    def attach(self, session: Session) -> Session:
+        """
+          Routes all requests of a session through this limiter. Existing adapters, including their retry settings, are kept.
+
+        :param session: Session to govern, e.g. BeastConnector.http.
+        :return: The same session
+        """
+        for prefix, adapter in list(session.adapters.items()):
+            if not isinstance(adapter, _RateLimitedAdapter):
+                session.mount(prefix, _RateLimitedAdapter(self, adapter))
+
+        return session
+
+
+class _RateLimitedAdapter(BaseAdapter):
+    """
+    Transport adapter that sends requests through a rate limiter.
+    """
+
+    def __init__(self, limiter: RequestRateLimiter, adapter: BaseAdapter):
+        super().__init__()
+        self._limiter = limiter
+        self._adapter = adapter
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream=False,
+        timeout=None,
+        verify=True,
+        cert=None,
+        proxies=None,
+    ) -> Response:
+        with self._limiter.slot(request.url):
+            response = self._adapter.send(
+                request,
+                stream=stream,
+                timeout=timeout,
+                verify=verify,
+                cert=cert,
+                proxies=proxies,
+            )
+        self._limiter.observe(request.url, response)
+        return response
+
+    def close(self) -> None:
+        self._adapter.close()
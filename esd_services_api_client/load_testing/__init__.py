@@ -0,0 +1,27 @@
+"""
+ Locust load profiles for Beast and Boxer deployments. Requires the load-testing extra.
+"""
+
+
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+from esd_services_api_client.load_testing._users import (
+    STUB_HOST,
+    BeastUser,
+    BoxerClaimUser,
+    ConnectorUser,
+    stub_server,
+)
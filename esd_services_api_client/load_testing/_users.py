@@ -0,0 +1,172 @@
+"""
+  Locust users that generate load on Beast and Boxer through this client's connectors.
+"""
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import functools
+import time
+import uuid
+from typing import Optional
+
+from adapta.utils import session_with_retries
+from locust import User, between, task
+from requests import HTTPError, Response, Session
+
+from esd_services_api_client.beast.v3 import BeastConnector, BeastJobParams
+from esd_services_api_client.boxer import BoxerClaimConnector, BoxerTokenAuth, Claim
+from esd_services_api_client.common._metrics import current_operation
+from esd_services_api_client.testing import FakeServiceServer
+
+STUB_HOST = "stub"
+
+
+@functools.lru_cache(maxsize=1)
+def stub_server() -> FakeServiceServer:
+    """
+      Returns the fake Beast/Boxer server used when users run against the "stub" host, started on first use.
+
+    :return: A running FakeServiceServer shared by all users of the process
+    """
+    return FakeServiceServer(polls_to_complete=3).start()
+
+
+class ConnectorUser(User):
+    """
+    Base class for users that drive a connector. Every HTTP call of the connector is reported to Locust,
+    named after the connector operation that made it, e.g. "beast.submit".
+    Run with --host stub to generate load on an in-process fake server instead of a deployment.
+    """
+
+    abstract = True
+    wait_time = between(1, 5)
+
+    @property
+    def base_url(self) -> str:
+        """
+        Base URL of the service under test
+        """
+        return stub_server().url if self.host == STUB_HOST else self.host
+
+    def auth(self) -> Optional[BoxerTokenAuth]:
+        """
+          Returns authentication for the service under test. Override to run against a secured deployment.
+
+        :return: Boxer-based authentication, or None for anonymous access
+        """
+        return None
+
+    def report_requests(self, session: Session) -> Session:
+        """
+          Reports every response received by a session to Locust.
+          404 responses are reported as successes, as connectors use them to signal missing requests, users or configurations.
+
+        :param session: Connector session.
+        :return: The same session
+        """
+
+        def report(response: Response, *_, **kwargs) -> None:
+            failed = not response.ok and response.status_code != 404
+            size = response.headers.get("Content-Length")
+            if size is None and not kwargs.get("stream"):
+                size = len(response.content or b"")
+            self.environment.events.request.fire(
+                request_type=response.request.method,
+                name=current_operation(),
+                response_time=response.elapsed.total_seconds() * 1000,
+                response_length=int(size or 0),
+                response=response,
+                context={},
+                exception=HTTPError(
+                    f"{response.status_code} {response.reason}", response=response
+                )
+                if failed
+                else None,
+            )
+
+        session.hooks["response"].append(report)
+        return session
+
+
+class BeastUser(ConnectorUser):
+    """
+    Submits Beast jobs, polls them to a terminal stage and reads their logs. Also reads the deployed job configuration.
+    """
+
+    job_name = "locust-load-test"
+    poll_interval: float = 1
+    max_polls = 600
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        self.connector = BeastConnector(
+            base_url=self.base_url, auth=self.auth(), lifecycle_check_interval=1
+        )
+        self.report_requests(self.connector.http)
+
+    @task(3)
+    def submit_and_poll(self) -> None:
+        """
+        Submits a job with a unique client tag, waits for it to finish and reads its logs
+        """
+        request_id = self.connector.start_job(
+            BeastJobParams(client_tag=f"locust-{uuid.uuid4()}"), self.job_name
+        )
+        terminal_stages = self.connector.success_stages + self.connector.failed_stages
+        for _ in range(self.max_polls):
+            if (
+                self.connector.get_request_lifecycle_stage(request_id)
+                in terminal_stages
+            ):
+                break
+            time.sleep(self.poll_interval)
+
+        self.connector.get_logs(request_id)
+
+    @task(1)
+    def read_configuration(self) -> None:
+        """
+        Reads the deployed configuration of the job
+        """
+        self.connector.get_configuration(self.job_name)
+
+
+class BoxerClaimUser(ConnectorUser):
+    """
+    Creates a user, adds, reads and removes its claims, then removes the user.
+    """
+
+    provider = "locust"
+    claim = Claim("locust.load-test/resource", ".*")
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        self.connector = BoxerClaimConnector(
+            base_url=self.base_url,
+            auth=self.auth(),
+            session=self.report_requests(session_with_retries()),
+        )
+
+    @task
+    def claim_lifecycle(self) -> None:
+        """
+        Runs create, read, update and delete operations for a new user
+        """
+        user_id = f"locust-{uuid.uuid4()}"
+        self.connector.add_user(user_id, self.provider)
+        self.connector.add_claim(user_id, self.provider, [self.claim])
+        list(self.connector.get_claims(user_id, self.provider) or [])
+        self.connector.remove_claim(user_id, self.provider, [self.claim])
+        self.connector.remove_user(user_id, self.provider)
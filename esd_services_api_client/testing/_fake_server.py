@@ -0,0 +1,381 @@
+"""
+  In-process stand-in for Beast and Boxer HTTP APIs, for benchmarks, load tests and integration tests.
+"""
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import json
+import random
+import threading
+import time
+import urllib.request
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple, Any
+from urllib.parse import urlsplit
+
+
+@dataclass
+class FaultInjection:
+    """
+    Latency and errors added to every response of the fake server, except Boxer token requests, which use token_latency
+
+    Attributes:
+        latency: time in seconds to wait before responding.
+        error_rate: fraction of requests answered with error_status instead of the normal response.
+        error_status: HTTP status code of injected errors.
+        retry_after: if set, injected errors carry a Retry-After header with this many seconds.
+    """
+
+    latency: float = 0
+    error_rate: float = 0
+    error_status: int = 503
+    retry_after: Optional[float] = None
+
+
+@dataclass
+class _FakeRequest:
+    request_id: str
+    client_tag: str
+    job_name: str
+    body: dict
+    polls: int = 0
+    stage: Optional[str] = None
+    log_lines: list[str] = field(default_factory=list)
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class FakeServiceServer:
+    """
+    Serves the subset of Beast and Boxer APIs used by this client:
+      - Beast: /job/submit, /job/requests, /job/requests/tags, /job/logs and /job/deployed.
+      - Boxer: /token/<provider>, and a Boxer-protected /resource.
+      - Boxer Claims: /claim/<provider>/<user>.
+    Submitted requests complete after a configurable number of lifecycle reads, or when set_stage is called.
+    If callback_url is set, stages set with set_stage are also pushed to it as lifecycle events.
+    """
+
+    def __init__(
+        self,
+        *,
+        faults: Optional[FaultInjection] = None,
+        polls_to_complete: int = 2,
+        log_lines: int = 10,
+        token_latency: float = 0,
+        seed: Optional[int] = None,
+    ):
+        """
+          Creates a fake server, listening on a random local port once started.
+
+        :param faults: Latency and error injection. No faults by default.
+        :param polls_to_complete: Number of lifecycle reads after which a submitted request is COMPLETED.
+        :param log_lines: Number of log lines produced by each request.
+        :param token_latency: Time in seconds Boxer takes to issue a token.
+        :param seed: Seed for error injection, to make runs repeatable.
+        """
+        self.faults = faults or FaultInjection()
+        self.polls_to_complete = polls_to_complete
+        self.log_lines = log_lines
+        self.token_latency = token_latency
+        self.external_token: Optional[str] = None
+        self.callback_url: Optional[str] = None
+        self.boxer_token: Optional[str] = None
+        self.token_requests = 0
+        self.request_counts: Counter = Counter()
+        self._issued = 0
+        self._rng = random.Random(seed)
+        self._requests: Dict[str, _FakeRequest] = {}
+        self._tags: Dict[str, list[str]] = {}
+        self._users: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """
+        Base URL of the server
+        """
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self) -> "FakeServiceServer":
+        """
+          Starts serving in a background thread.
+
+        :return: The started server
+        """
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops the server and releases its port
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeServiceServer":
+        return self.start()
+
+    def __exit__(self, *_) -> None:
+        self.stop()
+
+    def expire_token(self) -> None:
+        """
+        Invalidates the last issued Boxer token
+        """
+        self.boxer_token = None
+
+    def expire_external_token(self) -> None:
+        """
+        Rotates the external token, so the token presented so far is rejected
+        """
+        self.external_token = f"external-{self._issued}"
+
+    def set_stage(self, request_id: str, lifecycle_stage: str = "COMPLETED") -> None:
+        """
+          Moves a request to a lifecycle stage, and pushes the change to callback_url if it is set.
+
+        :param request_id: Request identifier.
+        :param lifecycle_stage: New lifecycle stage of the request.
+        """
+        with self._lock:
+            self._requests[request_id].stage = lifecycle_stage
+
+        if self.callback_url:
+            event = urllib.request.Request(
+                self.callback_url,
+                data=json.dumps(
+                    {"id": request_id, "lifeCycleStage": lifecycle_stage}
+                ).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            with urllib.request.urlopen(event, timeout=5):
+                pass
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.faults.error_rate
+
+    def _issue_token(self) -> str:
+        time.sleep(self.token_latency)
+        with self._lock:
+            self.token_requests += 1
+            self._issued += 1
+            self.boxer_token = f"boxer-{self._issued}"
+            return self.boxer_token
+
+    def _submit(self, job_name: str, body: dict) -> dict:
+        request_id = str(uuid.uuid4())
+        with self._lock:
+            self._requests[request_id] = _FakeRequest(
+                request_id=request_id,
+                client_tag=body.get("clientTag", ""),
+                job_name=job_name,
+                body=body,
+                log_lines=[f"{request_id}: line {n}" for n in range(self.log_lines)],
+            )
+            self._tags.setdefault(body.get("clientTag", ""), []).append(request_id)
+
+        return {"id": request_id, "lifeCycleStage": "NEW"}
+
+    def _read_request(self, request_id: str) -> Optional[dict]:
+        with self._lock:
+            request = self._requests.get(request_id)
+            if request is None:
+                return None
+            request.polls += 1
+            if request.stage is not None:
+                stage = request.stage
+            elif request.polls > self.polls_to_complete:
+                stage = "COMPLETED"
+            elif request.polls > 1:
+                stage = "RUNNING"
+            else:
+                stage = "NEW"
+
+        return {
+            "id": request.request_id,
+            "lifeCycleStage": stage,
+            "clientTag": request.client_tag,
+            "jobName": request.job_name,
+        }
+
+    def _configuration(self, name: str) -> dict:
+        return {
+            "rootPath": "/ecco/dist",
+            "projectName": name,
+            "runnable": "main.py",
+            "submissionDetails": {
+                "version": "3.5.0",
+                "executionGroup": "default",
+                "expectedParallelism": 4,
+                "flexibleDriver": False,
+                "additionalDriverNodeTolerations": {},
+                "maxRuntimeHours": 1,
+                "debugMode": None,
+                "submissionMode": "k8s",
+                "extendedCodeMount": False,
+                "submissionJobTemplate": "default",
+                "executorSpecTemplate": "default",
+                "driverJobRetries": 1,
+                "defaultArguments": {},
+                "inputs": [],
+                "outputs": [],
+                "overwrite": True,
+            },
+        }
+
+    def _claim_response(self, provider: str, user_id: str) -> Optional[dict]:
+        with self._lock:
+            claims = self._users.get((provider, user_id))
+            if claims is None:
+                return None
+            return {
+                "identityProvider": provider,
+                "userId": user_id,
+                "claims": [{name: value} for name, value in claims.items()],
+                "billingId": "",
+            }
+
+    def _claims(
+        self, method: str, provider: str, user_id: str, body: Optional[dict]
+    ) -> Tuple[int, Any]:
+        key = (provider, user_id)
+        with self._lock:
+            exists = key in self._users
+            if method == "POST" and not exists:
+                self._users[key] = {}
+            elif method == "DELETE" and exists:
+                del self._users[key]
+                return 200, None
+            elif method == "PATCH" and exists:
+                if body["operation"] == "Insert":
+                    self._users[key] |= body["claims"]
+                else:
+                    for name in body["claims"]:
+                        self._users[key].pop(name, None)
+
+        response = self._claim_response(provider, user_id)
+        return (404, None) if response is None else (200, response)
+
+    def _route(
+        self, method: str, path: str, authorization: str, body: Optional[dict]
+    ) -> Tuple[int, Any]:
+        # pylint: disable=too-many-return-statements
+        parts = path.strip("/").split("/")
+        match (method, parts):
+            case ("GET", ["token", _]):
+                if self.external_token is not None and authorization != (
+                    f"Bearer {self.external_token}"
+                ):
+                    return 401, None
+                return 200, self._issue_token()
+            case ("GET", ["resource"]):
+                return (
+                    200 if authorization == f"Bearer {self.boxer_token}" else 401
+                ), None
+            case ("POST", ["job", "submit", job_name]):
+                return 202, self._submit(job_name, body or {})
+            case ("GET", ["job", "requests", "tags", client_tag]):
+                with self._lock:
+                    return 200, list(self._tags.get(client_tag, []))
+            case ("GET", ["job", "requests", request_id]):
+                request = self._read_request(request_id)
+                return (404, None) if request is None else (200, request)
+            case ("GET", ["job", "logs", request_id]):
+                with self._lock:
+                    request = self._requests.get(request_id)
+                return (404, None) if request is None else (200, request.log_lines)
+            case ("GET", ["job", "deployed", name]):
+                return 200, self._configuration(name)
+            case (_, ["claim", provider, user_id]):
+                return self._claims(method, provider, user_id, body)
+
+        return 404, None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """
+            Routes requests to the fake server.
+            """
+
+            protocol_version = "HTTP/1.1"
+            # headers and body are written separately, so Nagle's algorithm would delay keep-alive responses
+            disable_nagle_algorithm = True
+
+            def log_message(self, *_):
+                pass
+
+            def _reply(
+                self, status: int, body: Any = None, headers: Optional[dict] = None
+            ) -> None:
+                if body is None:
+                    payload = b""
+                elif isinstance(body, str):
+                    payload = body.encode("utf-8")
+                else:
+                    payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                if not isinstance(body, str):
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _handle(self):
+                path = urlsplit(self.path).path
+                length = int(self.headers.get("Content-Length") or 0)
+                raw_body = self.rfile.read(length) if length else b""
+                with server._lock:
+                    server.request_counts[(self.command, path.split("/")[1])] += 1
+
+                is_token_request = path.startswith("/token/")
+                if server.faults.latency and not is_token_request:
+                    time.sleep(server.faults.latency)
+                if server.faults.error_rate and server._should_fail():
+                    self._reply(
+                        server.faults.error_status,
+                        headers={"Retry-After": str(server.faults.retry_after)}
+                        if server.faults.retry_after is not None
+                        else None,
+                    )
+                    return
+
+                status, body = server._route(
+                    self.command,
+                    path,
+                    self.headers.get("Authorization", ""),
+                    json.loads(raw_body) if raw_body else None,
+                )
+                self._reply(status, body)
+
+            do_GET = _handle
+            do_POST = _handle
+            do_PATCH = _handle
+            do_DELETE = _handle
+
+        return Handler
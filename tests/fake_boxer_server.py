@@ -0,0 +1,31 @@
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+"""
+ Local stand-in for Boxer token API and a Boxer-protected service.
+"""
+
+from esd_services_api_client.testing import FakeServiceServer
+
+
+class FakeBoxerServer(FakeServiceServer):
+    """
+    Issues Boxer tokens at /token/<provider> for a valid external token, and serves /resource for a valid Boxer token.
+    Tokens can be invalidated with expire_token and expire_external_token.
+    """
+
+    def __init__(self, token_latency: float = 0.05):
+        super().__init__(token_latency=token_latency)
+        self.external_token = "external-0"
@@ -0,0 +1,154 @@
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from esd_services_api_client.beast.v3 import AsyncBeastConnector, BeastJobParams
+from esd_services_api_client.boxer import BoxerToken, BoxerTokenAuth
+from esd_services_api_client.boxer._base import BoxerTokenProvider
+
+
+def _beast_handler(stages: dict[str, list[str]], submitted: list[dict]):
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.startswith("/job/requests/tags/"):
+            return httpx.Response(200, json=[])
+        if path.startswith("/job/submit/"):
+            submitted.append(json.loads(request.content))
+            return httpx.Response(202, json={"id": "r1", "lifeCycleStage": "NEW"})
+        if path.startswith("/job/requests/"):
+            request_id = path.rsplit("/", 1)[-1]
+            return httpx.Response(
+                200,
+                json={"id": request_id, "lifeCycleStage": stages[request_id].pop(0)},
+            )
+        if path.startswith("/job/logs/"):
+            return httpx.Response(200, json=["line 1", "line 2"])
+        return httpx.Response(404)
+
+    return handler
+
+
+def _connector(handler) -> AsyncBeastConnector:
+    return AsyncBeastConnector(
+        base_url="https://beast.test",
+        lifecycle_check_interval=0,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+
+def test_async_run_job():
+    submitted = []
+    connector = _connector(_beast_handler({"r1": ["RUNNING", "COMPLETED"]}, submitted))
+
+    asyncio.run(
+        connector.run_job(
+            BeastJobParams(client_tag="tag", extra_arguments={"a": 1}), "job"
+        )
+    )
+
+    assert submitted[0]["clientTag"] == "tag"
+    assert submitted[0]["extraArgs"] == {"a": "1"}
+
+
+def test_async_run_job_failed():
+    connector = _connector(_beast_handler({"r1": ["FAILED"]}, []))
+
+    with pytest.raises(Exception, match="Execution failed"):
+        asyncio.run(connector.run_job(BeastJobParams(client_tag="tag"), "job"))
+
+
+def test_async_get_logs_and_configuration():
+    connector = _connector(_beast_handler({}, []))
+
+    async def _read():
+        return await connector.get_logs("r1"), await connector.get_configuration(
+            "missing"
+        )
+
+    logs, configuration = asyncio.run(_read())
+
+    assert logs == "line 1\nline 2"
+    assert configuration is None
+
+
+class _SequentialTokenProvider(BoxerTokenProvider):
+    def __init__(self):
+        self.calls = 0
+
+    def get_token(self) -> BoxerToken:
+        self.calls += 1
+        return BoxerToken(f"boxer-{self.calls}")
+
+
+def test_async_token_refresh_is_single_flight():
+    provider = _SequentialTokenProvider()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers["Authorization"] == "Bearer boxer-1":
+            return httpx.Response(401)
+        return httpx.Response(200, json={"lifeCycleStage": "RUNNING"})
+
+    connector = AsyncBeastConnector(
+        base_url="https://beast.test",
+        auth=BoxerTokenAuth(provider),
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    async def _read_all():
+        return await asyncio.gather(
+            *(connector.get_request_lifecycle_stage(f"r{n}") for n in range(20))
+        )
+
+    assert asyncio.run(_read_all()) == ["RUNNING"] * 20
+    assert provider.calls == 2
+
+
+def test_async_client_errors_are_not_retried():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(404)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(_connector(handler).get_request_lifecycle_stage("missing"))
+
+    assert calls == ["/job/requests/missing"]
+
+
+def test_async_reads_retry_transient_errors(mocker):
+    mocker.patch("asyncio.sleep", mocker.AsyncMock())
+    responses = {
+        "/job/logs/r1": [
+            httpx.Response(503),
+            httpx.Response(429),
+            httpx.Response(200, json=["line 1"]),
+        ],
+        "/job/deployed/missing": [httpx.Response(502), httpx.Response(404)],
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return responses[request.url.path].pop(0)
+
+    connector = _connector(handler)
+
+    assert asyncio.run(connector.get_logs("r1")) == "line 1"
+    assert asyncio.run(connector.get_configuration("missing")) is None
+    assert not any(responses.values())
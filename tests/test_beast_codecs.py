@@ -0,0 +1,90 @@
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import copy
+import json
+import weakref
+
+import pytest
+
+from esd_services_api_client.beast.v3 import (
+    JobRequest,
+    JobSocket,
+    SparkSubmissionConfiguration,
+)
+from esd_services_api_client.beast.v3._codecs import (
+    job_request_to_dict,
+    spark_submission_configuration_from_dict,
+    spark_submission_configuration_from_json,
+)
+from tests.test_configuration_cache import CONFIGURATION
+
+
+def _request(expected_parallelism) -> JobRequest:
+    return JobRequest(
+        inputs=[JobSocket(alias="in", data_path="abfss://in/ü", data_format="csv")],
+        outputs=[
+            JobSocket(alias="out", data_path="s3://out", data_format="delta"),
+            JobSocket(alias="log", data_path="s3://log", data_format="json"),
+        ],
+        extra_args={"date": "2024-01-01", "quoted": '"a\\b"'},
+        client_tag="tag-1",
+        expected_parallelism=expected_parallelism,
+    )
+
+
+@pytest.mark.parametrize("expected_parallelism", [None, 8])
+@pytest.mark.parametrize(
+    "dumps_args", [{}, {"ensure_ascii": False, "separators": (",", ":")}]
+)
+def test_job_request_encodes_byte_identical(expected_parallelism, dumps_args):
+    request = _request(expected_parallelism)
+
+    assert json.dumps(job_request_to_dict(request), **dumps_args) == json.dumps(
+        request.to_dict(), **dumps_args
+    )
+
+
+def test_configuration_decodes_like_dataclasses_json():
+    configuration = copy.deepcopy(CONFIGURATION)
+    configuration["submissionDetails"]["debugMode"] = {
+        "eventLogLocation": "s3://events",
+        "maxSizePerFile": "10m",
+    }
+    configuration["submissionDetails"]["inputs"] = [
+        {"alias": "in", "dataPath": "s3://in", "dataFormat": "csv"}
+    ]
+
+    assert spark_submission_configuration_from_dict(
+        configuration
+    ) == SparkSubmissionConfiguration.from_dict(configuration)
+    assert spark_submission_configuration_from_json(
+        json.dumps(configuration).encode("utf-8")
+    ) == SparkSubmissionConfiguration.from_dict(configuration)
+
+
+def test_malformed_configuration_raises_like_dataclasses_json():
+    configuration = copy.deepcopy(CONFIGURATION)
+    del configuration["runnable"]
+
+    with pytest.raises(KeyError):
+        spark_submission_configuration_from_dict(configuration)
+
+
+def test_models_keep_regular_dataclass_behaviour():
+    socket = JobSocket(alias="in", data_path="s3://in", data_format="csv")
+
+    assert weakref.ref(socket)() is socket
+    assert "__slots__" not in JobSocket.__dict__
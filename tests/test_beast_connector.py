@@ -13,12 +13,19 @@
 #  limitations under the License.
 #
 
+import io
 import json
 import pathlib
 
 import pytest
 
-from esd_services_api_client.beast.v3 import JobRequest
+from esd_services_api_client.beast.v3 import (
+    JobRequest,
+    BeastConnector,
+    BeastJobParams,
+    FixedPollingStrategy,
+)
+from esd_services_api_client.beast.v3._connector import _iter_json_strings
 
 
 def test_request_ser():
@@ -63,3 +70,139 @@ def test_request_ser():
 )
 def test_request_dict(job_request):
     assert job_request.to_dict()
+
+
+def test_existing_submission_skips_terminal_requests(requests_mock):
+    connector = BeastConnector.create_anonymous(
+        base_url="https://beast.test", lookup_concurrency=2
+    )
+    requests_mock.get(
+        "https://beast.test/job/requests/tags/tag", json=["r1", "r2", "r3"]
+    )
+    for request_id, stage in [("r1", "FAILED"), ("r2", "COMPLETED"), ("r3", "RUNNING")]:
+        requests_mock.get(
+            f"https://beast.test/job/requests/{request_id}",
+            json={"lifeCycleStage": stage},
+        )
+
+    assert connector._existing_submission("tag") == ("r3", "RUNNING")
+    assert connector._existing_submission("tag") == ("r3", "RUNNING")
+    lookups = [
+        request.path
+        for request in requests_mock.request_history
+        if not request.path.startswith("/job/requests/tags/")
+    ]
+    assert sorted(lookups) == [
+        "/job/requests/r1",
+        "/job/requests/r2",
+        "/job/requests/r3",
+        "/job/requests/r3",
+    ]
+
+
+def test_iter_json_strings_across_chunks():
+    body = json.dumps(["first", 'quoted "line"', "ünïcode", ""]).encode("utf-8")
+    chunks = [body[position : position + 3] for position in range(0, len(body), 3)]
+
+    assert list(_iter_json_strings(chunks)) == [
+        "first",
+        'quoted "line"',
+        "ünïcode",
+        "",
+    ]
+
+
+def test_iter_and_write_logs(requests_mock):
+    connector = BeastConnector.create_anonymous(base_url="https://beast.test")
+    requests_mock.get(
+        "https://beast.test/job/logs/r1", json=["line 1", "line 2", "line 3"]
+    )
+    requests_mock.get("https://beast.test/job/logs/missing", status_code=404)
+    output = io.StringIO()
+
+    assert list(connector.iter_logs("r1", since_line=1)) == ["line 2", "line 3"]
+    assert not list(connector.iter_logs("missing"))
+    assert connector.write_logs("r1", output) == 3
+    assert output.getvalue() == "line 1\nline 2\nline 3\n"
+
+
+def test_run_job_tails_logs(requests_mock):
+    connector = BeastConnector.create_anonymous(
+        base_url="https://beast.test",
+        polling_strategy=FixedPollingStrategy(0, sleep=lambda _: None),
+    )
+    requests_mock.get("https://beast.test/job/requests/tags/tag", json=["r1"])
+    requests_mock.get(
+        "https://beast.test/job/requests/r1",
+        [
+            {"json": {"lifeCycleStage": "RUNNING"}},
+            {"json": {"lifeCycleStage": "RUNNING"}},
+            {"json": {"lifeCycleStage": "RUNNING"}},
+            {"json": {"lifeCycleStage": "FAILED"}},
+        ],
+    )
+    requests_mock.get(
+        "https://beast.test/job/logs/r1",
+        [
+            {"json": ["line 1"]},
+            {"status_code": 500},
+            {"json": ["line 1", "line 2", "error"]},
+        ],
+    )
+    tailed = []
+
+    with pytest.raises(Exception, match="Execution failed"):
+        connector.run_job(
+            BeastJobParams(client_tag="tag"),
+            "job",
+            tail_logs=True,
+            log_sink=tailed.append,
+        )
+
+    assert tailed == ["line 1", "line 2", "error"]
+
+
+def test_submit_many_dedups_and_reports_per_tag(requests_mock):
+    slept = []
+    connector = BeastConnector.create_anonymous(
+        base_url="https://beast.test",
+        polling_strategy=FixedPollingStrategy(0, sleep=slept.append),
+    )
+    requests_mock.get("https://beast.test/job/requests/tags/t1", json=[])
+    requests_mock.get("https://beast.test/job/requests/tags/t2", json=["r2"])
+    requests_mock.get(
+        "https://beast.test/job/requests/r2", json={"lifeCycleStage": "RUNNING"}
+    )
+    submissions = requests_mock.post(
+        "https://beast.test/job/submit/job",
+        [
+            {"status_code": 429, "headers": {"Retry-After": "3"}},
+            {
+                "status_code": 202,
+                "json": {"id": "r1", "lifeCycleStage": "NEW"},
+            },
+        ],
+    )
+    requests_mock.get(
+        "https://beast.test/job/requests/tags/t3",
+        status_code=400,
+        reason="bad tag",
+    )
+
+    results = connector.submit_many(
+        [
+            BeastJobParams(client_tag="t1"),
+            BeastJobParams(client_tag="t2"),
+            BeastJobParams(client_tag="t1"),
+            BeastJobParams(client_tag="t3"),
+        ],
+        "job",
+        concurrency=1,
+    )
+
+    assert list(results) == ["t1", "t2", "t3"]
+    assert (results["t1"].request_id, results["t1"].submitted) == ("r1", True)
+    assert (results["t2"].request_id, results["t2"].submitted) == ("r2", False)
+    assert not results["t3"].succeeded and results["t3"].error is not None
+    assert submissions.call_count == 2
+    assert slept == [3.0]
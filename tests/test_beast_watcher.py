@@ -0,0 +1,242 @@
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import threading
+import time
+
+import pytest
+import requests
+
+from esd_services_api_client.beast.v3 import (
+    BeastConnector,
+    BeastJobParams,
+    BeastJobWatcher,
+    FixedPollingStrategy,
+    LifecycleEventReceiver,
+)
+from esd_services_api_client.testing import FakeServiceServer
+
+
+def test_watcher_resolves_terminal_requests(requests_mock):
+    requests_mock.get(
+        "https://beast.test/job/requests/r1",
+        [
+            {"json": {"lifeCycleStage": "RUNNING"}},
+            {"json": {"lifeCycleStage": "COMPLETED"}},
+        ],
+    )
+    requests_mock.get(
+        "https://beast.test/job/requests/r2", json={"lifeCycleStage": "FAILED"}
+    )
+    watcher = BeastJobWatcher(
+        BeastConnector.create_anonymous(base_url="https://beast.test"),
+        max_in_flight=2,
+    )
+    completed = []
+
+    r1 = watcher.watch("r1", callback=lambda rid, stage: completed.append(rid))
+    r2 = watcher.watch("r2")
+    watcher.poll_once()
+
+    assert r2.result(timeout=0) == "FAILED"
+    assert not r1.done()
+    assert watcher.tracked == ["r1"]
+
+    watcher.poll_once()
+
+    assert r1.result(timeout=0) == "COMPLETED"
+    assert completed == ["r1"]
+    assert not watcher.tracked
+
+
+def test_watcher_background_polling(requests_mock):
+    requests_mock.get(
+        "https://beast.test/job/requests/r1", json={"lifeCycleStage": "COMPLETED"}
+    )
+
+    with BeastJobWatcher(
+        BeastConnector.create_anonymous(base_url="https://beast.test"),
+        check_interval=0.01,
+    ) as watcher:
+        assert watcher.watch("r1").result(timeout=5) == "COMPLETED"
+
+
+def test_watcher_stops_worker_threads_and_follows_connector_interval(
+    requests_mock,
+):
+    requests_mock.get(
+        "https://beast.test/job/requests/r1", json={"lifeCycleStage": "COMPLETED"}
+    )
+    connector = BeastConnector.create_anonymous(
+        base_url="https://beast.test", lifecycle_check_interval=3600
+    )
+    watcher = BeastJobWatcher(connector)
+    connector.lifecycle_check_interval = 0.01
+    threads_before = set(threading.enumerate())
+
+    with watcher:
+        assert watcher.watch("r1").result(timeout=5) == "COMPLETED"
+
+    assert not [
+        thread
+        for thread in set(threading.enumerate()) - threads_before
+        if thread.name.startswith("beast-watcher")
+    ]
+
+
+def test_receiver_passes_authorized_events_to_listeners():
+    received = []
+    with LifecycleEventReceiver(host="127.0.0.1", token="secret") as receiver:
+        receiver.subscribe(lambda rid, stage: received.append((rid, stage)))
+        unauthorized = requests.post(
+            receiver.url, json={"id": "r1", "lifeCycleStage": "COMPLETED"}
+        )
+        malformed = requests.post(
+            receiver.url, json={"id": "r1"}, headers={"Authorization": "Bearer secret"}
+        )
+        accepted = requests.post(
+            receiver.url,
+            json=[
+                {"id": "r1", "lifeCycleStage": "RUNNING"},
+                {"id": "r2", "lifeCycleStage": "FAILED"},
+            ],
+            headers={"Authorization": "Bearer secret"},
+        )
+
+    assert (unauthorized.status_code, malformed.status_code) == (401, 400)
+    assert accepted.status_code == 204
+    assert received == [("r1", "RUNNING"), ("r2", "FAILED")]
+
+
+def test_receiver_requires_token_beyond_loopback():
+    with pytest.raises(ValueError, match="token is required"):
+        LifecycleEventReceiver(host="0.0.0.0")
+
+    receiver = LifecycleEventReceiver()
+    try:
+        assert receiver.url.startswith("http://127.0.0.1:")
+    finally:
+        receiver.stop()
+
+
+def test_run_job_completes_on_pushed_event():
+    receiver = LifecycleEventReceiver(host="127.0.0.1")
+    with FakeServiceServer(polls_to_complete=1000) as server:
+        server.callback_url = receiver.url
+        connector = BeastConnector.create_anonymous(base_url=server.url)
+        request_id = connector.start_job(BeastJobParams(client_tag="pushed"), "job")
+
+        # polling is only a safety net, so a long check interval never fires in this test
+        with BeastJobWatcher(connector, check_interval=600, events=receiver) as watcher:
+            run = threading.Thread(
+                target=connector.run_job,
+                args=(BeastJobParams(client_tag="pushed"), "job"),
+                kwargs={"watcher": watcher},
+            )
+            run.start()
+            while request_id not in watcher.tracked:
+                time.sleep(0.01)
+            reads_before_event = server.request_counts[("GET", "job")]
+
+            server.set_stage(request_id, "RUNNING")
+            server.set_stage(request_id, "COMPLETED")
+            run.join(timeout=5)
+
+    assert not run.is_alive()
+    # a single read confirms the pushed terminal stage
+    assert server.request_counts[("GET", "job")] == reads_before_event + 1
+
+
+def test_failed_lookup_keeps_request_tracked(mocker):
+    connector = BeastConnector.create_anonymous(base_url="https://beast.test")
+    mocker.patch.object(
+        connector,
+        "get_request_lifecycle_stage",
+        side_effect=[RuntimeError("connection reset"), "FAILED", "COMPLETED"],
+    )
+    watcher = BeastJobWatcher(connector, max_in_flight=1)
+    r1 = watcher.watch("r1")
+    r2 = watcher.watch("r2")
+
+    watcher.poll_once()
+
+    assert r2.result(timeout=0) == "FAILED"
+    assert watcher.tracked == ["r1"]
+
+    watcher.poll_once()
+
+    assert r1.result(timeout=0) == "COMPLETED"
+
+
+def test_background_polling_survives_failed_lookups(mocker):
+    connector = BeastConnector.create_anonymous(base_url="https://beast.test")
+    mocker.patch.object(
+        connector,
+        "get_request_lifecycle_stage",
+        side_effect=[RuntimeError("connection reset"), "COMPLETED"],
+    )
+
+    with BeastJobWatcher(connector, check_interval=0.01) as watcher:
+        assert watcher.watch("r1").result(timeout=5) == "COMPLETED"
+
+
+def test_receiver_accepts_events_after_restart():
+    received = []
+    receiver = LifecycleEventReceiver(host="127.0.0.1")
+    receiver.subscribe(lambda rid, stage: received.append((rid, stage)))
+    watcher = BeastJobWatcher(
+        BeastConnector.create_anonymous(base_url="https://beast.test"),
+        check_interval=600,
+        events=receiver,
+    )
+
+    watcher.start()
+    watcher.stop()
+    watcher.start()
+    try:
+        response = requests.post(
+            receiver.url, json={"id": "r1", "lifeCycleStage": "RUNNING"}, timeout=5
+        )
+    finally:
+        watcher.stop()
+
+    assert response.status_code == 204
+    assert received == [("r1", "RUNNING")]
+
+
+def test_run_job_polls_directly_when_watcher_is_not_running(requests_mock):
+    requests_mock.get("https://beast.test/job/requests/tags/tag", json=[])
+    requests_mock.post(
+        "https://beast.test/job/submit/job",
+        status_code=202,
+        json={"id": "r1", "lifeCycleStage": "NEW"},
+    )
+    requests_mock.get(
+        "https://beast.test/job/requests/r1",
+        [
+            {"json": {"lifeCycleStage": "RUNNING"}},
+            {"json": {"lifeCycleStage": "COMPLETED"}},
+        ],
+    )
+    connector = BeastConnector.create_anonymous(
+        base_url="https://beast.test",
+        polling_strategy=FixedPollingStrategy(0, sleep=lambda _: None),
+    )
+    watcher = BeastJobWatcher(connector)
+
+    connector.run_job(BeastJobParams(client_tag="tag"), "job", watcher=watcher)
+
+    assert not watcher.running
+    assert requests_mock.call_count == 4
@@ -0,0 +1,51 @@
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import base64
+
+import pytest
+from Crypto.Hash import SHA256
+from Crypto.PublicKey import RSA
+from Crypto.Signature import pkcs1_15
+from requests import Request
+
+from esd_services_api_client.boxer import BoxerAuth
+
+
+@pytest.fixture(scope="module")
+def rsa_key():
+    return RSA.generate(1024)
+
+
+def test_boxer_auth_signs_payload(rsa_key, mocker):
+    auth = BoxerAuth(
+        private_key_base64=base64.b64encode(rsa_key.export_key("DER")).decode("utf-8"),
+        consumer_id="consumer",
+    )
+    import_key = mocker.spy(RSA, "importKey")
+
+    first = auth(Request("GET", "https://boxer.test/token/provider?a=1").prepare())
+    second = auth(Request("GET", "https://boxer.test/token/provider").prepare())
+    other = auth(Request("GET", "https://boxer.test/token/other").prepare())
+
+    assert first.headers["X-Boxer-Payload"] == "boxer.test/token/provider"
+    assert first.headers["Authorization"] == second.headers["Authorization"]
+    assert first.headers["Authorization"] != other.headers["Authorization"]
+    assert import_key.call_count == 1
+    assert auth._sign_string.cache_info().hits == 1
+    pkcs1_15.new(rsa_key.public_key()).verify(
+        SHA256.new(b"boxer.test/token/provider"),
+        base64.b64decode(first.headers["Authorization"].removeprefix("Signature ")),
+    )
@@ -0,0 +1,271 @@
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import requests
+
+from esd_services_api_client.boxer import (
+    BoxerClaimConnector,
+    Claim,
+    ClaimCache,
+    ClaimChange,
+)
+
+BASE_URL = "https://boxer-claim.test"
+
+
+def _claim_response(user_id: str, claims: list[dict]) -> dict:
+    return {
+        "identityProvider": "azuread",
+        "userId": user_id,
+        "claims": claims,
+        "billingId": "",
+    }
+
+
+def test_apply_claims_reports_results_per_change(requests_mock):
+    connector = BoxerClaimConnector(base_url=BASE_URL)
+    for user_id in ["u1", "u2"]:
+        requests_mock.get(
+            f"{BASE_URL}/claim/azuread/{user_id}",
+            json=_claim_response(user_id, []),
+        )
+        requests_mock.patch(
+            f"{BASE_URL}/claim/azuread/{user_id}",
+            json=_claim_response(user_id, [{"c": ".*"}]),
+        )
+    requests_mock.get(f"{BASE_URL}/claim/azuread/u3", status_code=500)
+
+    results = connector.apply_claims(
+        [
+            ("u1", "azuread", "Insert", [Claim("c", ".*")]),
+            ClaimChange("u2", "azuread", "Delete", [Claim("c", ".*")]),
+            ("u3", "azuread", "Insert", [Claim("c", ".*")]),
+            ("u1", "azuread", "Upsert", [Claim("c", ".*")]),
+        ],
+        max_workers=2,
+    )
+
+    assert [result.succeeded for result in results] == [True, True, False, False]
+    assert results[0].response.user_id == "u1"
+    assert results[1].change.operation == "Delete"
+    assert isinstance(results[2].error, requests.HTTPError)
+    assert isinstance(results[3].error, ValueError)
+
+
+def test_apply_claims_reports_missing_users(requests_mock):
+    connector = BoxerClaimConnector(base_url=BASE_URL)
+    requests_mock.get(f"{BASE_URL}/claim/azuread/u1", status_code=404)
+
+    [result] = connector.apply_claims([("u1", "azuread", "Insert", [Claim("c", ".*")])])
+
+    assert not result.succeeded
+    assert result.user_missing
+    assert result.error is None
+
+
+def test_optimistic_claim_changes_skip_user_lookup(requests_mock):
+    connector = BoxerClaimConnector(base_url=BASE_URL, optimistic=True)
+    requests_mock.patch(
+        f"{BASE_URL}/claim/azuread/u1", json=_claim_response("u1", [{"c": ".*"}])
+    )
+    requests_mock.patch(f"{BASE_URL}/claim/azuread/missing", status_code=404)
+
+    assert connector.add_claim("u1", "azuread", [Claim("c", ".*")]).claims == [
+        {"c": ".*"}
+    ]
+    assert connector.remove_claim("missing", "azuread", [Claim("c", ".*")]) is None
+    assert [request.method for request in requests_mock.request_history] == [
+        "PATCH",
+        "PATCH",
+    ]
+    assert requests_mock.request_history[0].json() == {
+        "operation": "Insert",
+        "claims": {"c": ".*"},
+    }
+
+
+def test_user_existence_is_cached(requests_mock):
+    connector = BoxerClaimConnector(base_url=BASE_URL, user_existence_ttl=60)
+    requests_mock.get(f"{BASE_URL}/claim/azuread/u1", json=_claim_response("u1", []))
+    requests_mock.patch(f"{BASE_URL}/claim/azuread/u1", json=_claim_response("u1", []))
+    requests_mock.get(f"{BASE_URL}/claim/azuread/missing", status_code=404)
+
+    connector.add_claim("u1", "azuread", [Claim("c", ".*")])
+    connector.remove_claim("u1", "azuread", [Claim("c", ".*")])
+
+    assert connector.add_claim("missing", "azuread", [Claim("c", ".*")]) is None
+    assert [
+        (request.method, request.path) for request in requests_mock.request_history
+    ] == [
+        ("GET", "/claim/azuread/u1"),
+        ("PATCH", "/claim/azuread/u1"),
+        ("PATCH", "/claim/azuread/u1"),
+        ("GET", "/claim/azuread/missing"),
+    ]
+
+
+def _mock_sync_users(requests_mock):
+    requests_mock.get(
+        f"{BASE_URL}/claim/azuread/u1",
+        json=_claim_response("u1", [{"keep": ".*"}, {"drop": ".*"}]),
+    )
+    requests_mock.get(
+        f"{BASE_URL}/claim/azuread/u2", json=_claim_response("u2", [{"keep": ".*"}])
+    )
+    requests_mock.get(f"{BASE_URL}/claim/azuread/u3", status_code=404)
+    requests_mock.patch(f"{BASE_URL}/claim/azuread/u1", json=_claim_response("u1", []))
+
+
+def test_sync_claims_dry_run(requests_mock):
+    _mock_sync_users(requests_mock)
+    connector = BoxerClaimConnector(base_url=BASE_URL)
+
+    report = connector.sync_claims(
+        {
+            "u1": [Claim("keep", ".*"), Claim("add", ".*")],
+            "u2": [Claim("keep", ".*")],
+            "u3": [Claim("keep", ".*")],
+        },
+        "azuread",
+        dry_run=True,
+    )
+
+    assert len(report.plans) == 1
+    assert report.plans[0].inserts == [Claim("add", ".*")]
+    assert report.plans[0].deletes == [Claim("drop", ".*")]
+    assert report.missing_users == ["u3"]
+    assert not report.results
+    assert all(request.method == "GET" for request in requests_mock.request_history)
+
+
+def test_sync_claims_applies_minimal_changes(requests_mock):
+    _mock_sync_users(requests_mock)
+    connector = BoxerClaimConnector(base_url=BASE_URL)
+
+    report = connector.sync_claims(
+        {"u1": [Claim("keep", ".*"), Claim("add", ".*")], "u2": [Claim("keep", ".*")]},
+        "azuread",
+    )
+
+    patches = [
+        request.json()
+        for request in requests_mock.request_history
+        if request.method == "PATCH"
+    ]
+    assert patches == [
+        {"operation": "Delete", "claims": {"drop": ".*"}},
+        {"operation": "Insert", "claims": {"add": ".*"}},
+    ]
+    assert not report.failed
+    assert report.fetch_seconds >= 0 and report.apply_seconds >= 0
+
+
+def test_claims_are_served_from_cache(requests_mock):
+    connector = BoxerClaimConnector(base_url=BASE_URL, claim_cache=ClaimCache(ttl=60))
+    requests_mock.get(
+        f"{BASE_URL}/claim/azuread/u1",
+        [
+            {"json": _claim_response("u1", [{"a": ".*"}, {"b": "x"}])},
+            {"json": _claim_response("u1", [{"a": ".*"}])},
+        ],
+    )
+    requests_mock.patch(f"{BASE_URL}/claim/azuread/u1", json=_claim_response("u1", []))
+
+    assert list(connector.get_claims("u1", "azuread")) == [
+        Claim("a", ".*"),
+        Claim("b", "x"),
+    ]
+    assert len(list(connector.get_claims("u1", "azuread"))) == 2
+    assert connector.claim_cache.users_with_claim("b") == {"u1"}
+    assert requests_mock.call_count == 1
+
+    connector.remove_claim("u1", "azuread", [Claim("b", "x")])
+
+    assert not connector.claim_cache.users_with_claim("b")
+    assert list(connector.get_claims("u1", "azuread")) == [Claim("a", ".*")]
+    assert connector.claim_cache.users_with_claim("a", provider="azuread") == {"u1"}
+
+
+def test_claim_cache_expires_and_evicts():
+    now = [0.0]
+    cache = ClaimCache(max_size=1, ttl=10, clock=lambda: now[0])
+    cache.put("azuread", "u1", [Claim("a", ".*")])
+
+    now[0] = 11
+    assert cache.get("azuread", "u1") is None
+    assert not cache.users_with_claim("a")
+
+    cache.put("azuread", "u1", [Claim("a", ".*")])
+    cache.put("azuread", "u2", [Claim("a", ".*")])
+    assert cache.users_with_claim("a") == {"u2"}
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_claims_read_before_invalidation_are_not_cached(requests_mock):
+    connector = BoxerClaimConnector(
+        base_url=BASE_URL, claim_cache=ClaimCache(ttl=60), optimistic=True
+    )
+    requests_mock.patch(f"{BASE_URL}/claim/azuread/u1", json=_claim_response("u1", []))
+
+    def revoke_during_read(request, context):
+        # the claim is revoked while the read is in flight
+        connector.remove_claim("u1", "azuread", [Claim("b", "x")])
+        return _claim_response("u1", [{"a": ".*"}, {"b": "x"}])
+
+    requests_mock.get(
+        f"{BASE_URL}/claim/azuread/u1",
+        [
+            {"json": revoke_during_read},
+            {"json": _claim_response("u1", [{"a": ".*"}])},
+        ],
+    )
+
+    assert len(list(connector.get_claims("u1", "azuread"))) == 2
+    assert connector.claim_cache.get("azuread", "u1") is None
+    assert list(connector.get_claims("u1", "azuread")) == [Claim("a", ".*")]
+    assert list(connector.get_claims("u1", "azuread")) == [Claim("a", ".*")]
+    assert requests_mock.call_count == 3
+
+
+def test_claim_cache_drops_puts_after_forgotten_invalidations():
+    cache = ClaimCache(max_size=1)
+    generation = cache.generation()
+    cache.invalidate("azuread", "u1")
+    cache.invalidate("azuread", "u2")
+
+    cache.put("azuread", "u1", [Claim("a", ".*")], generation)
+    assert cache.get("azuread", "u1") is None
+
+    cache.put("azuread", "u1", [Claim("a", ".*")], cache.generation())
+    assert cache.get("azuread", "u1") == (Claim("a", ".*"),)
+
+
+def test_sync_claims_reports_users_removed_before_the_change(requests_mock):
+    connector = BoxerClaimConnector(base_url=BASE_URL)
+    requests_mock.get(
+        f"{BASE_URL}/claim/azuread/u1", json=_claim_response("u1", [{"drop": ".*"}])
+    )
+    requests_mock.patch(f"{BASE_URL}/claim/azuread/u1", status_code=404)
+
+    report = connector.sync_claims({"u1": []}, "azuread")
+
+    assert [result.user_missing for result in report.failed] == [True]
+
+
+def test_claims_stay_mutable():
+    claim = Claim("a", ".*")
+    claim.claim_value = "x"
+
+    assert claim == Claim("a", "x")
@@ -0,0 +1,120 @@
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import base64
+import json
+import threading
+import time
+
+from esd_services_api_client.boxer import BoxerToken, BoxerTokenAuth
+from esd_services_api_client.boxer._base import BoxerTokenProvider
+
+
+def make_jwt(expires_at: float) -> str:
+    def _encode(value: dict) -> str:
+        return (
+            base64.urlsafe_b64encode(json.dumps(value).encode("utf-8"))
+            .decode("utf-8")
+            .rstrip("=")
+        )
+
+    return f"{_encode({'alg': 'HS256'})}.{_encode({'exp': expires_at})}.signature"
+
+
+class CountingTokenProvider(BoxerTokenProvider):
+    def __init__(self, lifetime: float, clock=time.time):
+        self.lifetime = lifetime
+        self.clock = clock
+        self.calls = 0
+        self.issued = threading.Event()
+
+    def get_token(self) -> BoxerToken:
+        self.calls += 1
+        self.issued.set()
+        return BoxerToken(make_jwt(self.clock() + self.lifetime))
+
+
+def test_token_expiration_is_decoded():
+    assert BoxerToken(make_jwt(1000)).expires_at == 1000
+    assert BoxerToken(make_jwt(1000)).expires_within(60, now=950)
+    assert not BoxerToken(make_jwt(1000)).expires_within(60, now=900)
+    assert BoxerToken("opaque-token").expires_at is None
+    assert not BoxerToken("opaque-token").expires_within(60)
+
+
+def test_token_is_refreshed_ahead_of_expiration():
+    now = [0.0]
+    provider = CountingTokenProvider(lifetime=300, clock=lambda: now[0])
+    auth = BoxerTokenAuth(provider, refresh_margin=60, clock=lambda: now[0])
+
+    first = auth._get_token()
+    now[0] = 200
+    assert auth._get_token() is first
+
+    now[0] = 250
+    assert auth._get_token() is not first
+    assert provider.calls == 2
+
+
+def test_refresh_margin_is_capped_for_short_lived_tokens():
+    now = [0.0]
+    provider = CountingTokenProvider(lifetime=60, clock=lambda: now[0])
+    auth = BoxerTokenAuth(provider, refresh_margin=60, clock=lambda: now[0])
+
+    tokens = [auth._get_token() for _ in range(10)]
+
+    assert provider.calls == 1
+    assert all(token is tokens[0] for token in tokens)
+
+    now[0] = 29
+    assert auth._get_token() is tokens[0]
+
+    now[0] = 31
+    assert auth._get_token() is not tokens[0]
+    assert provider.calls == 2
+
+
+def test_background_refresh():
+    provider = CountingTokenProvider(lifetime=1)
+    auth = BoxerTokenAuth(provider, refresh_margin=0.5, background_refresh=True)
+
+    assert provider.issued.wait(timeout=5)
+    auth.close()
+
+    assert provider.calls >= 1
+    assert auth._token.current is not None
+
+
+def test_background_refresh_survives_provider_errors():
+    class FailingOnceProvider(CountingTokenProvider):
+        def get_token(self) -> BoxerToken:
+            if self.calls == 0:
+                self.calls += 1
+                raise PermissionError("token store is not writable")
+            return super().get_token()
+
+    provider = FailingOnceProvider(lifetime=3600)
+    auth = BoxerTokenAuth(provider)
+    refresh = threading.Thread(
+        target=auth._refresh_ahead, kwargs={"retry_interval": 0.01}, daemon=True
+    )
+    refresh.start()
+
+    assert provider.issued.wait(timeout=5)
+    auth.close()
+    refresh.join(timeout=5)
+
+    assert provider.calls == 2
+    assert not refresh.is_alive()
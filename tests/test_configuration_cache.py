@@ -0,0 +1,94 @@
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+from esd_services_api_client.beast.v3 import BeastConnector, ConfigurationCache
+
+CONFIGURATION = {
+    "rootPath": "/ecco/dist",
+    "projectName": "project",
+    "runnable": "main.py",
+    "submissionDetails": {
+        "version": "3.5.0",
+        "executionGroup": "default",
+        "expectedParallelism": 4,
+        "flexibleDriver": False,
+        "additionalDriverNodeTolerations": {},
+        "maxRuntimeHours": 1,
+        "debugMode": None,
+        "submissionMode": "k8s",
+        "extendedCodeMount": False,
+        "submissionJobTemplate": "default",
+        "executorSpecTemplate": "default",
+        "driverJobRetries": 1,
+        "defaultArguments": {},
+        "inputs": [],
+        "outputs": [],
+        "overwrite": True,
+    },
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _connector(clock: FakeClock) -> BeastConnector:
+    return BeastConnector.create_anonymous(
+        base_url="https://beast.test",
+        configuration_cache=ConfigurationCache(ttl=10, negative_ttl=5, clock=clock),
+    )
+
+
+def test_configuration_is_revalidated_with_etag(requests_mock):
+    clock = FakeClock()
+    connector = _connector(clock)
+    requests_mock.get(
+        "https://beast.test/job/deployed/job",
+        [
+            {"json": CONFIGURATION, "headers": {"ETag": '"v1"'}},
+            {"status_code": 304},
+        ],
+    )
+
+    first = connector.get_configuration("job")
+    assert connector.get_configuration("job") is first
+    assert requests_mock.call_count == 1
+
+    clock.now = 11
+    assert connector.get_configuration("job") is first
+    assert requests_mock.call_count == 2
+    assert requests_mock.last_request.headers["If-None-Match"] == '"v1"'
+
+
+def test_missing_configuration_is_cached(requests_mock):
+    clock = FakeClock()
+    connector = _connector(clock)
+    requests_mock.get(
+        "https://beast.test/job/deployed/job",
+        [{"status_code": 404}, {"json": CONFIGURATION}],
+    )
+
+    assert connector.get_configuration("job") is None
+    assert connector.get_configuration("job") is None
+    assert requests_mock.call_count == 1
+
+    connector.invalidate_configuration("job")
+
+    assert connector.get_configuration("job").project_name == "project"
+    assert requests_mock.call_count == 2
@@ -0,0 +1,72 @@
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+from http.client import HTTPException
+
+import pytest
+
+from esd_services_api_client.beast.v3 import (
+    BeastConnector,
+    BeastJobParams,
+    FixedPollingStrategy,
+)
+from esd_services_api_client.boxer import BoxerClaimConnector, Claim
+from esd_services_api_client.testing import FakeServiceServer, FaultInjection
+
+
+def test_beast_flow_against_fake_server():
+    with FakeServiceServer(polls_to_complete=2, log_lines=3) as server:
+        connector = BeastConnector.create_anonymous(
+            base_url=server.url, polling_strategy=FixedPollingStrategy(0)
+        )
+
+        connector.run_job(BeastJobParams(client_tag="t1"), "job")
+        (request_id,) = connector.submit_many([BeastJobParams(client_tag="t2")], "job")[
+            "t2"
+        ].request_id.split(",")
+
+        assert connector.get_request_lifecycle_stage(request_id) == "NEW"
+        assert len(connector.get_logs(request_id).splitlines()) == 3
+        assert connector.get_configuration("job").project_name == "job"
+        assert server.request_counts[("POST", "job")] == 2
+
+
+def test_claim_flow_against_fake_server():
+    with FakeServiceServer() as server:
+        connector = BoxerClaimConnector(base_url=server.url)
+
+        assert connector.get_claims("user", "azuread") is None
+        connector.add_user("user", "azuread")
+        connector.add_claim("user", "azuread", [Claim("a", "1"), Claim("b", "2")])
+        connector.remove_claim("user", "azuread", [Claim("a", "1")])
+
+        assert list(connector.get_claims("user", "azuread")) == [Claim("b", "2")]
+        assert connector.remove_user("user", "azuread").status_code == 200
+
+
+def test_injected_throttling_is_retried():
+    with FakeServiceServer(
+        faults=FaultInjection(error_rate=1, error_status=429, retry_after=0)
+    ) as server:
+        connector = BeastConnector.create_anonymous(
+            base_url=server.url, polling_strategy=FixedPollingStrategy(0)
+        )
+
+        request = connector._prepare_request(BeastJobParams(client_tag="t1"))
+
+        with pytest.raises(HTTPException):
+            connector._submit(request, "job")
+
+        assert server.request_counts[("POST", "job")] == 6
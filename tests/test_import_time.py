@@ -0,0 +1,83 @@
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = [
+    "Crypto",
+    "cryptography",
+    "requests",
+    "backoff",
+    "adapta",
+    "pandas",
+    "datadog",
+    "httpx",
+]
+
+
+def _loaded_modules(statement: str) -> set[str]:
+    # a fresh interpreter, so modules imported by other tests do not hide regressions
+    probe = f"import json, sys; {statement}; print(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", probe], capture_output=True, text=True, check=True
+    )
+    return {module.split(".")[0] for module in json.loads(result.stdout)}
+
+
+@pytest.mark.parametrize(
+    "statement, allowed",
+    [
+        ("import esd_services_api_client.beast", []),
+        ("import esd_services_api_client.boxer", []),
+        ("import esd_services_api_client.common", []),
+        ("from esd_services_api_client.boxer import Claim, BoxerToken", []),
+        ("from esd_services_api_client.beast import JobRequest, JobSocket", []),
+        ("from esd_services_api_client.boxer import BoxerTokenAuth", ["requests"]),
+    ],
+)
+def test_import_does_not_load_heavy_dependencies(statement, allowed):
+    assert _loaded_modules(statement) & set(HEAVY_MODULES) == set(allowed)
+
+
+def test_lazy_names_resolve():
+    from esd_services_api_client import beast, boxer, common
+
+    assert beast.BeastConnector is beast.v3.BeastConnector
+    assert "BoxerClaimConnector" in dir(boxer)
+    assert set(common.__all__) <= set(dir(common))
+    with pytest.raises(AttributeError):
+        getattr(boxer, "Missing")
+
+
+@pytest.mark.parametrize(
+    "package", ["esd_services_api_client.beast", "esd_services_api_client.beast.v3"]
+)
+def test_star_import_without_optional_dependencies(package):
+    # a None entry in sys.modules makes `import httpx` fail, as on installs without the `async` extra
+    probe = (
+        "import sys; sys.modules['httpx'] = None; "
+        f"from {package} import *; "
+        "print(BeastConnector.__name__)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe], capture_output=True, text=True, check=False
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "BeastConnector"
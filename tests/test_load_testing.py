@@ -0,0 +1,62 @@
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import importlib.util
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).parent.parent
+
+
+# locust is only run in a separate process, as importing it monkey-patches the standard library with gevent
+@pytest.mark.skipif(
+    importlib.util.find_spec("locust") is None, reason="locust is not installed"
+)
+def test_locustfile_runs_against_stub():
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "locust",
+            "-f",
+            str(
+                REPO_ROOT / "esd_services_api_client" / "load_testing" / "locustfile.py"
+            ),
+            "--headless",
+            "--users=4",
+            "--spawn-rate=4",
+            "--run-time=6s",
+            "--host=stub",
+            "--only-summary",
+            "--loglevel=WARNING",
+        ],
+        capture_output=True,
+        text=True,
+        timeout=60,
+        cwd=REPO_ROOT,
+        env=os.environ | {"PYTHONPATH": str(REPO_ROOT)},
+        check=False,
+    )
+
+    summary = result.stderr
+    assert result.returncode == 0, summary
+    assert "beast.submit" in summary
+    assert "boxer.add_user" in summary
+    aggregated = next(line for line in summary.splitlines() if "Aggregated" in line)
+    assert "0(0.00%)" in aggregated
@@ -0,0 +1,104 @@
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import io
+
+from esd_services_api_client.beast.v3 import BeastConnector
+from esd_services_api_client.boxer import BoxerClaimConnector
+from esd_services_api_client.common import InMemoryMetricsProvider
+from esd_services_api_client.common._metrics import (
+    CALL_DURATION,
+    CALL_RETRIES,
+    HTTP_RESPONSES,
+    HTTP_RESPONSE_SIZE,
+)
+
+
+def test_beast_calls_are_instrumented(requests_mock):
+    metrics = InMemoryMetricsProvider()
+    connector = BeastConnector.create_anonymous(base_url="https://beast.test")
+    connector.metrics = metrics
+    requests_mock.get(
+        "https://beast.test/job/requests/r1",
+        [
+            {"json": {}},
+            {"json": {"lifeCycleStage": "RUNNING"}},
+        ],
+    )
+    requests_mock.get("https://beast.test/job/logs/r1", status_code=404)
+
+    assert connector.get_request_lifecycle_stage("r1") == "RUNNING"
+    assert connector.get_logs("r1") is None
+
+    durations = metrics.summaries(CALL_DURATION)
+    assert (
+        durations[(("operation", "beast.get_request"), ("outcome", "error"))].count == 1
+    )
+    assert (
+        durations[(("operation", "beast.get_request"), ("outcome", "success"))].count
+        == 1
+    )
+    assert (
+        metrics.counter(
+            CALL_RETRIES,
+            tags={"operation": "BeastConnector.get_request_lifecycle_stage"},
+        )
+        == 1
+    )
+    assert (
+        metrics.counter(
+            HTTP_RESPONSES,
+            tags={"operation": "beast.get_logs", "status_code": "404"},
+        )
+        == 1
+    )
+    assert [row["operation"] for row in metrics.report()].count("beast.get_logs") == 1
+
+
+def test_claim_calls_record_response_sizes(requests_mock):
+    metrics = InMemoryMetricsProvider()
+    connector = BoxerClaimConnector(
+        base_url="https://boxer.test", metrics_provider=metrics
+    )
+    body = '{"identityProvider": "azuread", "userId": "user", "claims": []}'
+    requests_mock.get("https://boxer.test/claim/azuread/user", text=body)
+
+    list(connector.get_claims("user", "azuread"))
+
+    sizes = metrics.summaries(HTTP_RESPONSE_SIZE)
+    assert [summary.total for summary in sizes.values()] == [len(body)]
+    assert dict(next(iter(sizes))) == {
+        "operation": "boxer.get_claims",
+        "status_code": "200",
+    }
+
+
+def test_streamed_logs_are_tagged_with_an_operation(requests_mock):
+    metrics = InMemoryMetricsProvider()
+    connector = BeastConnector.create_anonymous(base_url="https://beast.test")
+    connector.metrics = metrics
+    requests_mock.get("https://beast.test/job/logs/r1", json=["line 1", "line 2"])
+
+    assert connector.write_logs("r1", io.StringIO()) == 2
+    assert list(connector.iter_logs("r1", since_line=1)) == ["line 2"]
+
+    assert (
+        metrics.counter(
+            HTTP_RESPONSES,
+            tags={"operation": "beast.iter_logs", "status_code": "200"},
+        )
+        == 2
+    )
+    assert [row["operation"] for row in metrics.report()] == ["beast.write_logs"]
@@ -0,0 +1,114 @@
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import itertools
+
+from esd_services_api_client.beast.v3 import (
+    AdaptivePollingStrategy,
+    BeastConnector,
+    BeastJobParams,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_adaptive_intervals_ramp_up():
+    strategy = AdaptivePollingStrategy(initial_interval=1, max_interval=10, jitter=0)
+
+    assert list(itertools.islice(strategy.intervals("tag"), 6)) == [1, 2, 4, 8, 10, 10]
+
+
+def test_adaptive_intervals_use_runtime_hint():
+    strategy = AdaptivePollingStrategy(
+        initial_interval=1, max_interval=100, jitter=0, runtime_hint_ratio=0.5
+    )
+    strategy.record_runtime("tag", 400)
+
+    assert list(itertools.islice(strategy.intervals("tag"), 4)) == [100, 100, 1, 2]
+    assert list(itertools.islice(strategy.intervals("other"), 2)) == [1, 2]
+
+
+def test_adaptive_intervals_jitter():
+    strategy = AdaptivePollingStrategy(initial_interval=10, jitter=0.1)
+
+    assert all(
+        9 <= interval <= 11
+        for interval in itertools.islice(strategy.intervals("tag"), 1)
+    )
+
+
+def test_run_job_records_runtime(requests_mock):
+    clock = FakeClock()
+    strategy = AdaptivePollingStrategy(
+        initial_interval=1, jitter=0, clock=clock, sleep=clock.sleep
+    )
+    connector = BeastConnector.create_anonymous(
+        base_url="https://beast.test", polling_strategy=strategy
+    )
+    requests_mock.get("https://beast.test/job/requests/tags/tag", json=[])
+    requests_mock.post(
+        "https://beast.test/job/submit/job",
+        status_code=202,
+        json={"id": "r1", "lifeCycleStage": "NEW"},
+    )
+    requests_mock.get(
+        "https://beast.test/job/requests/r1",
+        [
+            {"json": {"lifeCycleStage": "RUNNING"}},
+            {"json": {"lifeCycleStage": "RUNNING"}},
+            {"json": {"lifeCycleStage": "COMPLETED"}},
+        ],
+    )
+
+    connector.run_job(BeastJobParams(client_tag="tag"), "job")
+
+    assert clock.sleeps == [1, 2, 4]
+    assert strategy.runtime_hint("tag") == 7
+
+
+def test_default_strategy_follows_lifecycle_check_interval(requests_mock, mocker):
+    connector = BeastConnector.create_anonymous(
+        base_url="https://beast.test", lifecycle_check_interval=60
+    )
+    sleep = mocker.patch.object(connector._polling_strategy, "sleep")
+    connector.lifecycle_check_interval = 3
+    requests_mock.get("https://beast.test/job/requests/tags/tag", json=[])
+    requests_mock.post(
+        "https://beast.test/job/submit/job",
+        status_code=202,
+        json={"id": "r1", "lifeCycleStage": "NEW"},
+    )
+    requests_mock.get(
+        "https://beast.test/job/requests/r1",
+        [
+            {"json": {"lifeCycleStage": "RUNNING"}},
+            {"json": {"lifeCycleStage": "COMPLETED"}},
+        ],
+    )
+
+    connector.run_job(BeastJobParams(client_tag="tag"), "job")
+
+    assert [call.args[0] for call in sleep.call_args_list] == [3, 3]
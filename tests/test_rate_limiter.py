@@ -0,0 +1,110 @@
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import responses
+from adapta.utils import session_with_retries
+
+from esd_services_api_client.beast.v3 import BeastConnector
+from esd_services_api_client.common import (
+    EndpointStats,
+    RateBudget,
+    RequestRateLimiter,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_token_bucket_spends_burst_then_spaces_requests():
+    clock = FakeClock()
+    bucket = TokenBucket(RateBudget(rate=2, burst=2), clock)
+
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0.5, 1.0]
+
+    clock.now = 10
+    bucket.pause(3)
+
+    assert bucket.reserve() == 3
+
+
+@responses.activate
+def test_limiter_applies_endpoint_budgets_and_retry_after():
+    clock = FakeClock()
+    limiter = RequestRateLimiter(
+        endpoint_budgets={
+            "/job/submit": RateBudget(rate=1),
+            "/job/requests": RateBudget(rate=100, burst=100),
+        },
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    connector = BeastConnector.create_anonymous(base_url="https://beast.test")
+    limiter.attach(connector.http)
+    responses.post("https://beast.test/job/submit/job", status=202)
+    responses.post(
+        "https://beast.test/job/submit/job", status=429, headers={"Retry-After": "7"}
+    )
+    responses.post("https://beast.test/job/submit/job", status=202)
+    responses.get("https://beast.test/job/requests/r1", json={})
+
+    for _ in range(3):
+        connector.http.post("https://beast.test/job/submit/job")
+    connector.http.get("https://beast.test/job/requests/r1")
+
+    stats = limiter.stats()
+    assert stats["/job/submit"] == EndpointStats(
+        requests=3, total_wait=8, max_wait=7, throttled=1
+    )
+    assert stats["/job/requests"].max_wait == 0
+
+
+@responses.activate
+def test_limiter_bounds_requests_in_flight():
+    limiter = RequestRateLimiter(max_in_flight=2)
+    session = limiter.attach(session_with_retries())
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def handler(_):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+        return 200, {}, "ok"
+
+    responses.add_callback(responses.GET, "https://beast.test/ping", callback=handler)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(lambda _: session.get("https://beast.test/ping"), range(6)))
+
+    assert peak == 2
+    assert limiter.stats()[""].requests == 6
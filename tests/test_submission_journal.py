@@ -0,0 +1,85 @@
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+from esd_services_api_client.beast.v3 import (
+    BeastConnector,
+    BeastJobParams,
+    FixedPollingStrategy,
+    SubmissionJournal,
+)
+
+
+def _connector(journal: SubmissionJournal) -> BeastConnector:
+    connector = BeastConnector.create_anonymous(
+        base_url="https://beast.test",
+        polling_strategy=FixedPollingStrategy(0, sleep=lambda _: None),
+    )
+    connector.journal = journal
+    return connector
+
+
+def test_journal_persists_entries(tmp_path):
+    journal = SubmissionJournal(str(tmp_path / "journal.db"))
+    journal.record("tag", "r1", "NEW")
+    journal.record("tag", "r2", "RUNNING")
+    journal.close()
+
+    restored = SubmissionJournal(str(tmp_path / "journal.db"))
+
+    entry = restored.get("tag")
+    assert (entry.request_id, entry.last_stage) == ("r2", "RUNNING")
+    assert restored.get("other") is None
+
+
+def test_run_job_resumes_journaled_request_without_tag_scan(tmp_path, requests_mock):
+    journal = SubmissionJournal(str(tmp_path / "journal.db"))
+    journal.record("tag", "r1", "RUNNING")
+    requests_mock.get(
+        "https://beast.test/job/requests/r1",
+        [
+            {"json": {"lifeCycleStage": "RUNNING"}},
+            {"json": {"lifeCycleStage": "COMPLETED"}},
+        ],
+    )
+
+    _connector(journal).run_job(BeastJobParams(client_tag="tag"), "job")
+
+    assert [request.path for request in requests_mock.request_history] == [
+        "/job/requests/r1",
+        "/job/requests/r1",
+    ]
+    assert journal.get("tag").last_stage == "COMPLETED"
+
+
+def test_finished_journal_entry_falls_back_to_tag_scan(tmp_path, requests_mock):
+    journal = SubmissionJournal(str(tmp_path / "journal.db"))
+    journal.record("tag", "r1", "COMPLETED")
+    requests_mock.get("https://beast.test/job/requests/tags/tag", json=["r1"])
+    requests_mock.get(
+        "https://beast.test/job/requests/r1", json={"lifeCycleStage": "COMPLETED"}
+    )
+    requests_mock.post(
+        "https://beast.test/job/submit/job",
+        status_code=202,
+        json={"id": "r2", "lifeCycleStage": "NEW"},
+    )
+
+    request_id = _connector(journal).start_job(BeastJobParams(client_tag="tag"), "job")
+
+    assert request_id == "r2"
+    assert (journal.get("tag").request_id, journal.get("tag").last_stage) == (
+        "r2",
+        "NEW",
+    )
@@ -0,0 +1,56 @@
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+from esd_services_api_client.beast.v3 import BeastConnector, TerminalRequestCache
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TerminalRequestCache(max_size=2)
+    cache.put("r1", {"lifeCycleStage": "COMPLETED"})
+    cache.put("r2", {"lifeCycleStage": "FAILED"})
+    cache.get("r1")
+    cache.put("r3", {"lifeCycleStage": "COMPLETED"})
+
+    assert cache.get("r2") is None
+    assert cache.get("r1") == {"lifeCycleStage": "COMPLETED"}
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_cache_persists_to_sqlite(tmp_path):
+    cache = TerminalRequestCache(path=str(tmp_path / "requests.db"))
+    cache.put("r1", {"lifeCycleStage": "COMPLETED", "id": "r1"})
+    cache.close()
+
+    restored = TerminalRequestCache(path=str(tmp_path / "requests.db"))
+
+    assert restored.get("r1") == {"lifeCycleStage": "COMPLETED", "id": "r1"}
+
+
+def test_connector_serves_terminal_requests_from_cache(requests_mock):
+    connector = BeastConnector.create_anonymous(base_url="https://beast.test")
+    requests_mock.get(
+        "https://beast.test/job/requests/r1",
+        [
+            {"json": {"lifeCycleStage": "RUNNING"}},
+            {"json": {"lifeCycleStage": "COMPLETED"}},
+        ],
+    )
+
+    assert connector.get_request_lifecycle_stage("r1") == "RUNNING"
+    assert connector.get_request_lifecycle_stage("r1") == "COMPLETED"
+    assert connector.get_request_runtime_info("r1") == {"lifeCycleStage": "COMPLETED"}
+    assert requests_mock.call_count == 2
+    assert connector.request_cache.hits == 1
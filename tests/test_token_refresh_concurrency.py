@@ -0,0 +1,114 @@
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from adapta.utils import session_with_retries
+
+from esd_services_api_client.boxer import (
+    BoxerConnector,
+    BoxerTokenAuth,
+    RefreshableExternalTokenAuth,
+)
+from tests.fake_boxer_server import FakeBoxerServer
+
+THREADS = 50
+
+
+def _run_concurrently(target) -> list:
+    barrier = threading.Barrier(THREADS)
+
+    def _synchronized(_):
+        barrier.wait()
+        return target()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        return list(pool.map(_synchronized, range(THREADS)))
+
+
+def test_boxer_token_refresh_is_single_flight():
+    with FakeBoxerServer() as server:
+        external_tokens = []
+        external_auth = RefreshableExternalTokenAuth(
+            lambda: external_tokens.append(server.external_token)
+            or server.external_token,
+            "provider",
+        )
+        auth = BoxerTokenAuth(BoxerConnector(base_url=server.url, auth=external_auth))
+        session = session_with_retries()
+        session.hooks["response"].append(auth.get_refresh_hook(session))
+        session.auth = auth
+
+        assert session.get(f"{server.url}/resource").status_code == 200
+        server.expire_token()
+
+        responses = _run_concurrently(
+            lambda: session.get(f"{server.url}/resource").status_code
+        )
+
+        assert responses == [200] * THREADS
+        assert server.token_requests == 2
+        # one external token per Boxer token request, not per rejected request
+        assert len(external_tokens) == 2
+
+
+def test_external_token_is_read_from_provider_on_every_request():
+    with FakeBoxerServer() as server:
+        external_tokens = []
+        connector = BoxerConnector(
+            base_url=server.url,
+            auth=RefreshableExternalTokenAuth(
+                lambda: external_tokens.append(server.external_token)
+                or server.external_token,
+                "provider",
+            ),
+        )
+        connector.get_token()
+        server.expire_external_token()
+        connector.get_token()
+
+        # the provider caches and renews its own token, so a rotated token is used without a rejected request
+        assert external_tokens == ["external-0", "external-1"]
+        assert server.request_counts[("GET", "token")] == 2
+
+
+def test_external_token_refresh_is_single_flight(mocker):
+    external_tokens = []
+    auth = RefreshableExternalTokenAuth(
+        lambda: external_tokens.append(f"external-{len(external_tokens)}")
+        or external_tokens[-1],
+        "provider",
+    )
+    session = mocker.Mock()
+    session.send.side_effect = lambda request: request.headers["Authorization"]
+
+    sent = auth(requests.Request("GET", "https://boxer.test/token/provider").prepare())
+
+    def _rejected_response() -> requests.Response:
+        response = requests.Response()
+        response.status_code = 401
+        response.request = sent.copy()
+        return response
+
+    rejected = [_rejected_response() for _ in range(THREADS)]
+
+    resent_with = _run_concurrently(
+        lambda: auth.refresh_token(rejected.pop(), session=session)
+    )
+
+    assert resent_with == ["Bearer external-1"] * THREADS
+    assert external_tokens == ["external-0", "external-1"]
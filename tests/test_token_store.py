@@ -0,0 +1,163 @@
+#  Copyright (c) 2023-2024. ECCO Sneaks & Data
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import base64
+import json
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from esd_services_api_client.boxer import (
+    BoxerConnector,
+    BoxerToken,
+    BoxerTokenAuth,
+    ExternalTokenAuth,
+    FileTokenStore,
+    RefreshableExternalTokenAuth,
+)
+from esd_services_api_client.boxer._base import BoxerTokenProvider
+
+
+class FileCountingTokenProvider(BoxerTokenProvider):
+    """Records every issued token in a file, so fetches can be counted across processes."""
+
+    def __init__(self, journal_path: str):
+        self.journal_path = journal_path
+
+    def get_token(self) -> BoxerToken:
+        time.sleep(0.05)
+        token = f"token-{os.getpid()}-{time.monotonic_ns()}"
+        with open(self.journal_path, "a", encoding="utf-8") as journal:
+            journal.write(f"{token}\n")
+        return BoxerToken(token)
+
+    def token_cache_key(self) -> str:
+        return self.journal_path
+
+    def issued(self) -> list[str]:
+        with open(self.journal_path, "r", encoding="utf-8") as journal:
+            return journal.read().splitlines()
+
+
+def _read_token(store_path: str, journal_path: str, results) -> None:
+    auth = BoxerTokenAuth(
+        FileCountingTokenProvider(journal_path),
+        token_store=FileTokenStore(store_path),
+    )
+    results.put(str(auth._get_token()))
+
+
+def test_token_is_shared_between_processes(tmp_path):
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    workers = [
+        context.Process(
+            target=_read_token,
+            args=(str(tmp_path / "store"), str(tmp_path / "issued"), results),
+        )
+        for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=30)
+
+    tokens = {results.get(timeout=5) for _ in workers}
+
+    assert len(tokens) == 1
+    assert FileCountingTokenProvider(str(tmp_path / "issued")).issued() == list(tokens)
+
+
+def test_rejected_token_is_not_served_from_store(tmp_path):
+    provider = FileCountingTokenProvider(str(tmp_path / "issued"))
+    store = FileTokenStore(str(tmp_path / "store"))
+    first = BoxerTokenAuth(provider, token_store=store)
+    second = BoxerTokenAuth(provider, token_store=store)
+
+    rejected = str(first._get_token())
+    assert str(second._get_token()) == rejected
+
+    refreshed = str(second._get_token(refresh=True, rejected_token=rejected))
+
+    assert refreshed != rejected
+    assert str(first._get_token(refresh=True, rejected_token=rejected)) == refreshed
+    assert len(provider.issued()) == 2
+
+
+def test_store_rejects_directory_accessible_to_other_users(tmp_path):
+    store_path = tmp_path / "store"
+    store_path.mkdir(mode=0o700)
+    store_path.chmod(0o755)
+
+    with pytest.raises(PermissionError, match="0o700"):
+        FileTokenStore(str(store_path))
+
+
+def test_store_rejects_directory_of_another_user(tmp_path, mocker):
+    mocker.patch(
+        "esd_services_api_client.boxer._token_store.os.getuid",
+        return_value=os.getuid() + 1,
+    )
+
+    with pytest.raises(PermissionError, match="not owned by the current user"):
+        FileTokenStore(str(tmp_path))
+
+
+def test_store_requires_fcntl(tmp_path, mocker):
+    mocker.patch("esd_services_api_client.boxer._token_store.fcntl", None)
+
+    with pytest.raises(OSError, match="POSIX"):
+        FileTokenStore(str(tmp_path / "store"))
+
+
+def _jwt(claims: dict) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode("utf-8"))
+    return f"e30.{payload.decode('utf-8').rstrip('=')}.signature"
+
+
+def test_token_cache_key_identifies_the_caller():
+    def key(auth) -> str:
+        return BoxerConnector(
+            base_url="https://boxer.test", auth=auth
+        ).token_cache_key()
+
+    first = key(
+        ExternalTokenAuth(_jwt({"iss": "aad", "sub": "a", "iat": 1}), "azuread")
+    )
+
+    assert first == key(
+        RefreshableExternalTokenAuth(
+            lambda: _jwt({"iss": "aad", "sub": "a", "iat": 2}), "azuread"
+        )
+    )
+    assert first != key(ExternalTokenAuth(_jwt({"iss": "aad", "sub": "b"}), "azuread"))
+    assert key(ExternalTokenAuth("opaque-1", "azuread")) != key(
+        ExternalTokenAuth("opaque-2", "azuread")
+    )
+
+
+def test_providers_without_cache_key_cannot_use_a_token_store(tmp_path):
+    class Provider(BoxerTokenProvider):
+        def get_token(self) -> BoxerToken:
+            return BoxerToken("token")
+
+    auth = BoxerTokenAuth(
+        Provider(), token_store=FileTokenStore(str(tmp_path / "store"))
+    )
+
+    with pytest.raises(NotImplementedError, match="token_cache_key"):
+        auth._get_token()